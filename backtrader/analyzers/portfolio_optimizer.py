@@ -17,6 +17,16 @@ from scipy.optimize import minimize
 import backtrader as bt
 
 
+def weights_to_array(weights: Dict[str, float]) -> np.ndarray:
+    """将 {资产名: 权重} 转换为 (asset, weight) 结构化数组"""
+    names = list(weights)
+    width = max(map(len, names), default=1)
+    arr = np.empty(len(names), dtype=[("asset", "U%d" % width), ("weight", "f8")])
+    arr["asset"] = names
+    arr["weight"] = list(weights.values())
+    return arr
+
+
 @dataclass
 class PortfolioWeights:
     """投资组合权重数据类"""
@@ -26,6 +36,10 @@ class PortfolioWeights:
     risk: float
     sharpe_ratio: float
 
+    def to_array(self) -> np.ndarray:
+        """权重的结构化数组形式 (asset, weight)，便于向量化计算"""
+        return weights_to_array(self.weights)
+
 
 class MeanVarianceOptimizer(bt.Analyzer):
     """
@@ -502,9 +516,48 @@ class PortfolioRebalancer:
         self.target_weights = {}
         self.last_rebalance = 0
 
-    def set_target_weights(self, weights: Dict[str, float]):
-        """设置目标权重"""
-        self.target_weights = weights
+        # 目标权重的结构化数组形式（与 _names/_datas 一一对应）
+        self._targets = weights_to_array({})
+        self._names = []
+        self._datas = []
+
+        # 同一周期、同一目标、同一持仓下的再平衡结果缓存
+        self._targets_version = 0
+        self._last_key = None
+        self._last_trades = []
+
+    def set_target_weights(self, weights):
+        """
+        设置目标权重
+
+        Args:
+            weights: {资产名: 权重}、PortfolioWeights 或 (asset, weight) 结构化数组
+        """
+        if isinstance(weights, PortfolioWeights):
+            weights = weights.weights
+
+        if isinstance(weights, np.ndarray):
+            targets = weights
+            self.target_weights = dict(
+                zip(targets["asset"].tolist(), targets["weight"].tolist())
+            )
+        else:
+            targets = weights_to_array(weights)
+            self.target_weights = weights
+
+        keep, datas = [], []
+        for i, data_name in enumerate(targets["asset"].tolist()):
+            try:
+                datas.append(self.strategy.getdatabyname(data_name))
+            except Exception as e:
+                print(f"再平衡 {data_name} 时出错: {e}")
+                continue
+            keep.append(i)
+
+        self._targets = targets[keep]
+        self._names = self._targets["asset"].tolist()
+        self._datas = datas
+        self._targets_version += 1
 
     def rebalance(
         self, tolerance: float = 0.05, min_interval: int = 10
@@ -526,34 +579,50 @@ class PortfolioRebalancer:
 
         trades = []
         try:
+            datas = self._datas
+            count = len(datas)
+
+            # 价格在周期内不变，周期、目标和持仓都未变化时直接复用上次结果
+            position_sizes = tuple(self.strategy.getposition(d).size for d in datas)
+            key = (current_bar, self._targets_version, tolerance, position_sizes)
+            if key == self._last_key:
+                return list(self._last_trades)
+
             current_value = self.strategy.broker.getvalue()
+            target_weights = self._targets["weight"]
 
-            for data_name, target_weight in self.target_weights.items():
-                try:
-                    data = self.strategy.getdatabyname(data_name)
-                    current_position = self.strategy.getposition(data)
-                    current_weight = (
-                        (current_position.size * data.close[0]) / current_value
-                        if current_value > 0 and current_position.size != 0
-                        else 0
-                    )
+            prices = np.fromiter((d.close[0] for d in datas), float, count)
+            sizes = np.array(position_sizes, dtype=float)
 
-                    # 如果偏离目标权重超过容忍度，则调整
-                    if abs(current_weight - target_weight) > tolerance:
-                        target_value = current_value * target_weight
-                        target_size = int(target_value / data.close[0])
-                        size_diff = target_size - current_position.size
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if current_value > 0:
+                    current_weights = sizes * prices / current_value
+                else:
+                    current_weights = np.zeros(count)
 
-                        if size_diff != 0:
-                            trades.append((data_name, size_diff, float(data.close[0])))
+                # 如果偏离目标权重超过容忍度，则调整
+                target_sizes = np.trunc(current_value * target_weights / prices)
 
-                except Exception as e:
-                    print(f"再平衡 {data_name} 时出错: {e}")
+            size_diffs = np.where(
+                (np.abs(current_weights - target_weights) > tolerance)
+                & np.isfinite(target_sizes),
+                target_sizes - sizes,
+                0,
+            )
+
+            names = self._names
+            trades = [
+                (names[i], int(size_diffs[i]), float(prices[i]))
+                for i in np.flatnonzero(size_diffs)
+            ]
 
             # 更新上次再平衡时间
             if trades:
                 self.last_rebalance = current_bar
 
+            self._last_key = key
+            self._last_trades = trades
+
         except Exception as e:
             print(f"再平衡过程出错: {e}")
 
@@ -7,8 +7,36 @@ Based on the detailed technical implementation roadmap
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import numpy as np
+
 import backtrader as bt
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # numba 为可选依赖
+
+
+def _trend_slope_py(closes):
+    """按时间顺序的10个收盘价: 近5期均值相对前5期均值的变化率"""
+    previous = closes[:5].mean()
+    return (closes[5:].mean() - previous) / previous
+
+
+def _relative_deviation_py(prices):
+    """价格相对均值的平均绝对偏离比例"""
+    avg_price = prices.mean()
+    return np.abs(prices - avg_price).mean() / avg_price
+
+
+# numba 可用时使用JIT编译版本（首次调用时编译，并缓存到磁盘）
+if njit:
+    _trend_slope = njit(cache=True)(_trend_slope_py)
+    _relative_deviation = njit(cache=True)(_relative_deviation_py)
+else:
+    _trend_slope = _trend_slope_py
+    _relative_deviation = _relative_deviation_py
+
 
 class RiskAnalyzer(bt.Analyzer):
     """
@@ -310,11 +338,9 @@ class MarketStateAnalyzer(bt.Analyzer):
         # 简化的趋势分析
         if len(self.strategy.datas[0]) > self.p.trend_period:
             data = self.strategy.datas[0]
-            # 计算简单移动平均线斜率
-            sma_current = sum(data.close.get(ago=-i) for i in range(5)) / 5
-            sma_previous = sum(data.close.get(ago=-(i + 5)) for i in range(5)) / 5
-
-            trend_slope = (sma_current - sma_previous) / sma_previous
+            # 计算简单移动平均线斜率（近5期与前5期均值）
+            closes = np.asarray(data.close.get(size=10), dtype=np.float64)
+            trend_slope = float(_trend_slope(closes))
             self.indicators["trend_slope"] = trend_slope
 
             if abs(trend_slope) > 0.01:  # 1%的趋势阈值
@@ -326,12 +352,9 @@ class MarketStateAnalyzer(bt.Analyzer):
         """分析市场波动率"""
         data = self.strategy.datas[0]
         if len(data) > 10:
-            # 计算近期价格波动率
-            recent_prices = [data.close[0]] + [data.close[-i] for i in range(1, 11)]
-            avg_price = sum(recent_prices) / len(recent_prices)
-            volatility = sum(
-                abs(p - avg_price) / avg_price for p in recent_prices
-            ) / len(recent_prices)
+            # 计算近期价格波动率（当前及前10期）
+            recent_prices = np.asarray(data.close.get(size=11), dtype=np.float64)
+            volatility = float(_relative_deviation(recent_prices))
             self.indicators["volatility"] = volatility
 
     def _analyze_volume(self):
@@ -339,7 +362,7 @@ class MarketStateAnalyzer(bt.Analyzer):
         data = self.strategy.datas[0]
         if hasattr(data, "volume") and len(data.volume) > 20:
             current_volume = data.volume[0]
-            avg_volume = sum(data.volume[-i] for i in range(1, 21)) / 20
+            avg_volume = float(np.mean(data.volume.get(ago=-1, size=20)))
             volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
             self.indicators["volume_ratio"] = volume_ratio
 
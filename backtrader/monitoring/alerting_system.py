@@ -232,7 +232,7 @@ class BusinessMetricsCollector(bt.Observer):
         """订单通知"""
         if order.status == order.Completed:
             self.orders_tracker["completed"] += 1
-        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
+        elif order.status in (order.Canceled, order.Margin, order.Rejected):
             self.orders_tracker["failed"] += 1
 
     def notify_trade(self, trade):
@@ -517,6 +517,9 @@ class AlertManager:
         self.channels: List[NotificationChannel] = []
         self.active_alerts: Dict[str, Alert] = {}
         self.alert_history: deque = deque(maxlen=10000)
+        # 随 alert_history 增量维护的分布统计，避免每次统计都遍历历史
+        self._severity_counts = defaultdict(int)
+        self._rule_counts = defaultdict(int)
         self._lock = threading.Lock()
 
     def add_rule(self, rule: AlertRule):
@@ -543,6 +546,24 @@ class AlertManager:
                 except Exception as e:
                     print(f"告警规则检查错误 {rule.name}: {e}")
 
+    def check_alerts_batch(self, contexts: List[Dict[str, Any]]):
+        """批量检查告警规则
+
+        按规则遍历整批上下文（而不是按上下文遍历全部规则），
+        单条规则的状态在整批检查中保持局部，结果与逐条调用
+        check_alerts 等价
+        """
+        with self._lock:
+            for rule in self.rules:
+                check = rule.check
+                for context in contexts:
+                    try:
+                        triggered, message = check(context)
+                        if triggered:
+                            self._handle_alert(rule.trigger(message))
+                    except Exception as e:
+                        print(f"告警规则检查错误 {rule.name}: {e}")
+
     def _handle_alert(self, alert: Alert):
         """处理告警"""
         # 检查是否已有相同活动告警（去重）
@@ -554,11 +575,30 @@ class AlertManager:
 
         # 添加新告警
         self.active_alerts[alert.rule_name] = alert
-        self.alert_history.append(alert)
+        self._record_history(alert)
 
         # 发送通知
         self._send_notifications(alert)
 
+    def _record_history(self, alert: Alert):
+        """记录告警历史并同步更新分布统计"""
+        history = self.alert_history
+        if len(history) == history.maxlen:
+            # 最旧的告警即将被挤出，先扣除其计数
+            evicted = history[0]
+            self._decrement(self._severity_counts, evicted.severity)
+            self._decrement(self._rule_counts, evicted.rule_name)
+
+        history.append(alert)
+        self._severity_counts[alert.severity] += 1
+        self._rule_counts[alert.rule_name] += 1
+
+    @staticmethod
+    def _decrement(counts, key):
+        counts[key] -= 1
+        if not counts[key]:
+            del counts[key]
+
     def _send_notifications(self, alert: Alert):
         """发送通知"""
         for channel in self.channels:
@@ -594,18 +634,11 @@ class AlertManager:
     def get_alert_statistics(self) -> Dict:
         """获取告警统计"""
         with self._lock:
-            severity_counts = defaultdict(int)
-            rule_counts = defaultdict(int)
-
-            for alert in self.alert_history:
-                severity_counts[alert.severity] += 1
-                rule_counts[alert.rule_name] += 1
-
             return {
                 "total_alerts": len(self.alert_history),
                 "active_alerts": len(self.active_alerts),
-                "severity_distribution": dict(severity_counts),
-                "rule_distribution": dict(rule_counts),
+                "severity_distribution": dict(self._severity_counts),
+                "rule_distribution": dict(self._rule_counts),
             }
 
 
@@ -614,13 +647,19 @@ class RealTimeMonitoringService:
     实时监控服务 - 整合所有监控组件
     """
 
-    def __init__(self, check_interval: float = 30.0):
+    def __init__(self, check_interval: float = 30.0, target_samples: int = 2):
         self.check_interval = check_interval
         self.system_collector = SystemMetricsCollector()
         self.alert_manager = AlertManager()
         self._running = False
         self._thread = None
 
+        # 完成 target_samples 次有效检查后置位，供调用方等待而非固定 sleep
+        self.target_samples = target_samples
+        self.sample_event = threading.Event()
+        self._sample_count = 0
+        self._stop_event = threading.Event()
+
         # 默认告警规则
         self._setup_default_rules()
 
@@ -647,6 +686,7 @@ class RealTimeMonitoringService:
         """启动监控服务"""
         if not self._running:
             self._running = True
+            self._stop_event.clear()
             self.system_collector.start()
             self._thread = threading.Thread(target=self._monitoring_loop, daemon=True)
             self._thread.start()
@@ -655,6 +695,7 @@ class RealTimeMonitoringService:
     def stop(self):
         """停止监控服务"""
         self._running = False
+        self._stop_event.set()  # 唤醒等待中的监控循环
         self.system_collector.stop()
         if self._thread:
             self._thread.join()
@@ -670,10 +711,15 @@ class RealTimeMonitoringService:
                 # 检查告警
                 self.alert_manager.check_alerts(context)
 
-                time.sleep(self.check_interval)
+                if context:
+                    self._sample_count += 1
+                    if self._sample_count >= self.target_samples:
+                        self.sample_event.set()
+
+                self._stop_event.wait(self.check_interval)
             except Exception as e:
                 print(f"监控循环错误: {e}")
-                time.sleep(self.check_interval)
+                self._stop_event.wait(self.check_interval)
 
     def _collect_monitoring_context(self) -> Dict[str, Any]:
         """收集监控上下文"""
@@ -748,9 +794,10 @@ class RealTimeMonitoringAnalyzer(bt.Analyzer):
 # 便捷函数
 def create_monitoring_service(
     check_interval: float = 30.0,
+    target_samples: int = 2,
 ) -> RealTimeMonitoringService:
     """创建监控服务实例"""
-    return RealTimeMonitoringService(check_interval)
+    return RealTimeMonitoringService(check_interval, target_samples)
 
 
 def add_monitoring_to_cerebro(cerebro, monitoring_service: RealTimeMonitoringService):
@@ -387,7 +387,7 @@ class StrategyMonitorMixin:
         """订单通知 - 发送告警"""
         super(StrategyMonitorMixin, self).notify_order(order)
 
-        if self.dashboard and order.status in [order.Margin, order.Rejected]:
+        if self.dashboard and order.status in (order.Margin, order.Rejected):
             alert = {
                 "type": "ORDER_ERROR",
                 "severity": "ERROR",
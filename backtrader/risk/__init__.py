@@ -34,6 +34,7 @@ from .config_manager import (
     PositionConcentrationRule,
     RiskConfigurationManager,
     RiskRule,
+    ThresholdRule,
     create_default_risk_config,
     load_risk_config_from_file,
     save_risk_config_to_file,
@@ -107,6 +108,7 @@ __all__ = [
     "RiskControlMixin",
     # 风控配置管理
     "RiskRule",
+    "ThresholdRule",
     "LeverageLimitRule",
     "PositionConcentrationRule",
     "DailyLossLimitRule",
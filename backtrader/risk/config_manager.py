@@ -28,6 +28,11 @@ class RiskRule:
     风控规则基类
     """
 
+    # 规则结果仅依赖的上下文键及阈值属性名；
+    # depends_on 为 None 表示规则有内部状态，检查结果不可缓存
+    depends_on = None
+    threshold_attr = None
+
     def __init__(self, name: str, description: str = "", enabled: bool = True):
         self.name = name
         self.description = description
@@ -42,90 +47,105 @@ class RiskRule:
         """
         raise NotImplementedError("子类必须实现check方法")
 
+    def cache_key(self, context: Dict[str, Any]):
+        """
+        返回本次检查的缓存键，相同键的检查结果相同
+        不可缓存时返回None
+        """
+        if self.depends_on is None:
+            return None
+        return (
+            self.enabled,
+            getattr(self, self.threshold_attr, None),
+            tuple(context.get(key, 0) for key in self.depends_on),
+        )
+
+    def record_violation(self):
+        """记录一次违规"""
+        self.violation_count += 1
+        self.last_violation = datetime.datetime.now()
+
     def reset(self):
         """重置规则状态"""
         self.violation_count = 0
         self.last_violation = None
 
 
-class LeverageLimitRule(RiskRule):
-    """杠杆限制规则"""
+class ThresholdRule(RiskRule):
+    """
+    阈值规则: context[context_key] > 阈值 即违规
+    """
 
-    def __init__(self, max_leverage: float = 2.0, **kwargs):
-        super().__init__("leverage_limit", "杠杆率限制", **kwargs)
-        self.max_leverage = max_leverage
+    context_key = None
+    message = ""  # message.format(当前值, 阈值)
+
+    @property
+    def depends_on(self):
+        # 重写了check的子类可能依赖其他上下文或内部状态，需自行声明depends_on，
+        # 未声明时结果不缓存
+        if type(self).check is not ThresholdRule.check:
+            return None
+        return (self.context_key,)
 
     def check(self, context: Dict[str, Any]) -> tuple:
         if not self.enabled:
             return True, ""
 
-        current_leverage = context.get("current_leverage", 0)
-        if current_leverage > self.max_leverage:
-            self.violation_count += 1
-            self.last_violation = datetime.datetime.now()
-            return False, f"杠杆超限: {current_leverage:.2f} > {self.max_leverage}"
+        value = context.get(self.context_key, 0)
+        threshold = getattr(self, self.threshold_attr)
+        if value > threshold:
+            self.record_violation()
+            return False, self.message.format(value, threshold)
         return True, ""
 
 
-class PositionConcentrationRule(RiskRule):
+class LeverageLimitRule(ThresholdRule):
+    """杠杆限制规则"""
+
+    context_key = "current_leverage"
+    threshold_attr = "max_leverage"
+    message = "杠杆超限: {:.2f} > {}"
+
+    def __init__(self, max_leverage: float = 2.0, **kwargs):
+        super().__init__("leverage_limit", "杠杆率限制", **kwargs)
+        self.max_leverage = max_leverage
+
+
+class PositionConcentrationRule(ThresholdRule):
     """持仓集中度规则"""
 
+    context_key = "position_concentration"
+    threshold_attr = "max_concentration"
+    message = "持仓集中度过高: {:.2%} > {:.2%}"
+
     def __init__(self, max_concentration: float = 0.3, **kwargs):
         super().__init__("position_concentration", "持仓集中度限制", **kwargs)
         self.max_concentration = max_concentration
 
-    def check(self, context: Dict[str, Any]) -> tuple:
-        if not self.enabled:
-            return True, ""
-
-        concentration = context.get("position_concentration", 0)
-        if concentration > self.max_concentration:
-            self.violation_count += 1
-            self.last_violation = datetime.datetime.now()
-            return (
-                False,
-                f"持仓集中度过高: {concentration:.2%} > {self.max_concentration:.2%}",
-            )
-        return True, ""
-
 
-class DailyLossLimitRule(RiskRule):
+class DailyLossLimitRule(ThresholdRule):
     """日亏损限制规则"""
 
+    context_key = "daily_loss"
+    threshold_attr = "max_daily_loss"
+    message = "日亏损超限: {:.2%} > {:.2%}"
+
     def __init__(self, max_daily_loss: float = 0.05, **kwargs):
         super().__init__("daily_loss_limit", "日亏损限制", **kwargs)
         self.max_daily_loss = max_daily_loss
 
-    def check(self, context: Dict[str, Any]) -> tuple:
-        if not self.enabled:
-            return True, ""
-
-        daily_loss = context.get("daily_loss", 0)
-        if daily_loss > self.max_daily_loss:
-            self.violation_count += 1
-            self.last_violation = datetime.datetime.now()
-            return False, f"日亏损超限: {daily_loss:.2%} > {self.max_daily_loss:.2%}"
-        return True, ""
-
 
-class MarketImpactRule(RiskRule):
+class MarketImpactRule(ThresholdRule):
     """市场冲击成本规则"""
 
+    context_key = "market_impact"
+    threshold_attr = "max_impact"
+    message = "市场冲击成本过高: {:.2%} > {:.2%}"
+
     def __init__(self, max_impact: float = 0.02, **kwargs):
         super().__init__("market_impact", "市场冲击成本限制", **kwargs)
         self.max_impact = max_impact
 
-    def check(self, context: Dict[str, Any]) -> tuple:
-        if not self.enabled:
-            return True, ""
-
-        impact_cost = context.get("market_impact", 0)
-        if impact_cost > self.max_impact:
-            self.violation_count += 1
-            self.last_violation = datetime.datetime.now()
-            return False, f"市场冲击成本过高: {impact_cost:.2%} > {self.max_impact:.2%}"
-        return True, ""
-
 
 class RiskConfigurationManager:
     """
@@ -139,6 +159,10 @@ class RiskConfigurationManager:
         self.violation_callbacks: List[Callable] = []
         self._lock = threading.RLock()
 
+        # 规则检查结果缓存 {(rule_name, cache_key): (passed, message)}
+        self._eval_cache: Dict[tuple, tuple] = {}
+        self._eval_cache_size = 1024
+
         # 默认规则组
         self.rule_groups["pre_trade"].extend(
             ["leverage_limit", "position_concentration", "market_impact"]
@@ -149,6 +173,7 @@ class RiskConfigurationManager:
         """添加风控规则"""
         with self._lock:
             self.rules[rule.name] = rule
+            self._eval_cache.clear()
             if groups:
                 for group in groups:
                     if rule.name not in self.rule_groups[group]:
@@ -159,6 +184,7 @@ class RiskConfigurationManager:
         with self._lock:
             if rule_name in self.rules:
                 del self.rules[rule_name]
+                self._eval_cache.clear()
                 # 从所有组中移除
                 for group_rules in self.rule_groups.values():
                     if rule_name in group_rules:
@@ -182,9 +208,9 @@ class RiskConfigurationManager:
             rules_to_check = self.rule_groups[group] if group else self.rules.keys()
 
             for rule_name in rules_to_check:
-                if rule_name in self.rules:
-                    rule = self.rules[rule_name]
-                    passed, message = rule.check(context)
+                rule = self.rules.get(rule_name)
+                if rule is not None:
+                    passed, message = self._check_rule(rule_name, rule, context)
                     results[rule_name] = (passed, message)
 
                     # 触发违规回调
@@ -193,6 +219,27 @@ class RiskConfigurationManager:
 
             return results
 
+    def _check_rule(self, rule_name: str, rule: RiskRule, context: Dict[str, Any]):
+        """执行单条规则检查，结果仅依赖部分上下文的规则会被缓存"""
+        try:
+            key = rule.cache_key(context)
+            cache_key = (rule_name, key) if key is not None else None
+            cached = self._eval_cache.get(cache_key) if cache_key else None
+        except TypeError:  # 上下文值不可哈希
+            cache_key = cached = None
+
+        if cached is not None:
+            if not cached[0]:
+                rule.record_violation()  # 命中缓存时保持违规统计一致
+            return cached
+
+        result = rule.check(context)
+        if cache_key is not None:
+            if len(self._eval_cache) >= self._eval_cache_size:
+                self._eval_cache.clear()
+            self._eval_cache[cache_key] = result
+        return result
+
     def add_violation_callback(self, callback: Callable):
         """添加违规回调函数"""
         with self._lock:
@@ -289,6 +336,7 @@ class RiskConfigurationManager:
 
             # 重建规则
             self.rules.clear()
+            self._eval_cache.clear()
             for name, rule_config in config.get("rules", {}).items():
                 rule = self._create_rule_from_config(name, rule_config)
                 if rule:
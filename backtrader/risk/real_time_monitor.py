@@ -20,6 +20,73 @@ import numpy as np
 
 import backtrader as bt
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # numba 为可选依赖
+
+
+def _tail_risk_py(returns_array, k):
+    """第k小收益率（VaR阈值）及不超过该阈值的全部收益的均值"""
+    part = np.partition(returns_array, k)
+    kth = part[k]
+    # 与阈值相等的收益可能被分到第k位之后，同样计入尾部
+    ties = np.sum(part[k + 1 :] == kth)
+    return kth, (part[: k + 1].sum() + ties * kth) / (k + 1 + ties)
+
+
+# numba 可用时使用JIT编译版本（首次调用时编译，并缓存到磁盘）
+_tail_risk_kernel = njit(cache=True)(_tail_risk_py) if njit else _tail_risk_py
+
+# 收益率历史的存储精度：收益率量级小且只需约5位有效数字，使用 float32 减半内存带宽
+# （tests/test_risk_monitor_precision.py 校验 VaR/CVaR 与 float64 的误差）
+_RETURNS_DTYPE = np.float32
+
+
+class _RingBuffer(object):
+    """
+    定长浮点环形缓冲区，接口与 deque(maxlen=size) 的常用部分一致
+    数据保存在预分配的 ndarray 中，追加时不产生 Python float 对象
+    """
+
+    def __init__(self, size, dtype=np.float64):
+        self._buf = np.empty(size, dtype=dtype)
+        self._idx = 0  # 下一个写入位置
+        self._count = 0
+
+    def append(self, value):
+        self._buf[self._idx] = value
+        self._idx = (self._idx + 1) % len(self._buf)
+        if self._count < len(self._buf):
+            self._count += 1
+
+    def clear(self):
+        self._idx = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("ring buffer index out of range")
+        return float(self._buf[(self._idx - self._count + i) % len(self._buf)])
+
+    def __iter__(self):
+        return iter(self.to_array().tolist())
+
+    def values(self):
+        """当前全部数据的视图（不保证时间顺序，不复制）"""
+        return self._buf[: self._count]
+
+    def to_array(self):
+        """按时间顺序排列的数据副本"""
+        if self._count < len(self._buf):
+            return self._buf[: self._count].copy()
+        return np.concatenate((self._buf[self._idx :], self._buf[: self._idx]))
+
 
 class RealTimeRiskMonitor(bt.Analyzer):
     """
@@ -37,16 +104,26 @@ class RealTimeRiskMonitor(bt.Analyzer):
         ("enable_cvar_monitoring", True),  # 启用CVaR监控
         ("enable_stress_testing", True),  # 启用压力测试
         ("enable_circuit_breaker", True),  # 启用熔断机制
+        ("var_update_interval", 1),  # VaR/CVaR重算间隔（周期数），1为每周期重算
+        ("var_drift_threshold", 0.05),  # 累计绝对收益超过该值时提前重算
     )
 
     def __init__(self):
         super(RealTimeRiskMonitor, self).__init__()
 
         # 风险数据存储
-        self.returns_history = deque(maxlen=self.p.lookback_period)
+        self.returns_history = _RingBuffer(self.p.lookback_period, _RETURNS_DTYPE)
         self.portfolio_values = deque(maxlen=self.p.lookback_period)
         self.drawdown_history = deque(maxlen=self.p.lookback_period)
 
+        # 回看窗口内的峰值: 单调递减队列 (序号, 价值)，队首即窗口最大值
+        self._peak_window = deque()
+        self._value_count = 0
+
+        # VaR/CVaR 重算调度: 距上次重算的周期数和累计绝对收益
+        self._bars_since_tail = 0
+        self._tail_drift = 0.0
+
         # 风险指标缓存
         self.current_var = 0.0
         self.current_cvar = 0.0
@@ -59,6 +136,7 @@ class RealTimeRiskMonitor(bt.Analyzer):
         self.circuit_breaker_triggered = False
         self.last_portfolio_value = None
         self.start_value = None
+        self.current_value = None  # 本周期账户价值，每周期只查询一次broker
 
         # 压力测试场景
         self.stress_scenarios = (
@@ -85,10 +163,11 @@ class RealTimeRiskMonitor(bt.Analyzer):
         """初始化"""
         self.start_value = self.strategy.broker.getvalue()
         self.last_portfolio_value = self.start_value
+        self.current_value = self.start_value
 
     def next(self):
         """每周期执行风险监控"""
-        current_value = self.strategy.broker.getvalue()
+        self.current_value = current_value = self.strategy.broker.getvalue()
 
         # 计算收益率
         if self.last_portfolio_value:
@@ -97,6 +176,9 @@ class RealTimeRiskMonitor(bt.Analyzer):
             ) / self.last_portfolio_value
             self.returns_history.append(returns)
             self.portfolio_values.append(current_value)
+            self._bars_since_tail += 1
+            self._tail_drift += abs(returns)
+            self._update_peak(current_value)
 
             # 计算回撤
             drawdown = self._calculate_drawdown()
@@ -105,53 +187,90 @@ class RealTimeRiskMonitor(bt.Analyzer):
 
         self.last_portfolio_value = current_value
 
+        # VaR/CVaR 仅在到期或收益漂移过大时重算，其余周期沿用上次结果
+        recompute_tail = len(self.returns_history) >= 30 and (
+            self._bars_since_tail >= self.p.var_update_interval
+            or self._tail_drift > self.p.var_drift_threshold
+        )
+        if recompute_tail:
+            self._bars_since_tail = 0
+            self._tail_drift = 0.0
+
         # 执行各项风险监控
-        self._monitor_var()
-        self._monitor_cvar()
+        self._monitor_var(recompute_tail)
+        self._monitor_cvar(recompute_tail)
         self._monitor_drawdown()
         self._monitor_risk_budget()
-        self._perform_stress_tests()
+        self._perform_stress_tests(current_value)
         self._check_circuit_breaker()
 
+    def _update_peak(self, value):
+        """增量维护回看窗口内的峰值，每周期均摊 O(1)"""
+        window = self._peak_window
+        while window and window[-1][1] <= value:
+            window.pop()
+        window.append((self._value_count, value))
+        self._value_count += 1
+
+        # 移除已滑出 portfolio_values 窗口的峰值
+        if window[0][0] <= self._value_count - self.p.lookback_period - 1:
+            window.popleft()
+
     def _calculate_drawdown(self):
         """计算当前回撤"""
-        if not self.portfolio_values:
+        if not self._peak_window:
             return 0.0
 
-        peak = max(self.portfolio_values)
+        peak = self._peak_window[0][1]
         current = self.portfolio_values[-1]
         return (peak - current) / peak if peak > 0 else 0.0
 
-    def _monitor_var(self):
-        """VaR监控"""
+    @staticmethod
+    def _tail_risk(returns_array, confidence_level):
+        """
+        计算VaR阈值与CVaR
+
+        使用 np.partition 选出第k小的收益率（O(N)），无需完整排序；
+        k 取 np.percentile 线性插值位置 (N-1)*q 的下界，尾部即 percentile 阈值
+        以下的全部收益，CVaR 与按 percentile 阈值筛选求均值的结果一致
+        返回: (var_threshold, cvar)
+        """
+        k = int((1 - confidence_level) * (len(returns_array) - 1))
+        var_threshold, tail_mean = _tail_risk_kernel(returns_array, k)
+        return float(var_threshold), abs(float(tail_mean))
+
+    def _monitor_var(self, recompute=True):
+        """VaR监控，recompute 为 False 时沿用上次的VaR阈值"""
         if not self.p.enable_var_monitoring or len(self.returns_history) < 30:
             return
 
-        returns_array = np.array(list(self.returns_history))
-        var_threshold = np.percentile(
-            returns_array, (1 - self.p.var_confidence_level) * 100
-        )
-        self.current_var = abs(var_threshold)
+        if recompute:
+            # 尾部统计与顺序无关，直接使用缓冲区视图
+            returns_array = self.returns_history.values()
+            var_threshold, _ = self._tail_risk(
+                returns_array, self.p.var_confidence_level
+            )
+            self.current_var = abs(var_threshold)
 
         # 检查VaR违规
-        if len(returns_array) > 0 and returns_array[-1] < -self.current_var:
+        last_return = self.returns_history[-1]
+        if last_return < -self.current_var:
             self.var_violations += 1
             self._trigger_alert(
                 "VAR_VIOLATION",
-                f"VaR违规: 实际损失{-returns_array[-1]:.2%} > VaR阈值{self.current_var:.2%}",
+                f"VaR违规: 实际损失{-last_return:.2%} > VaR阈值{self.current_var:.2%}",
             )
 
-    def _monitor_cvar(self):
-        """CVaR监控"""
+    def _monitor_cvar(self, recompute=True):
+        """CVaR监控，recompute 为 False 时沿用上次的CVaR"""
         if not self.p.enable_cvar_monitoring or len(self.returns_history) < 30:
             return
 
-        returns_array = np.array(list(self.returns_history))
-        var_threshold = np.percentile(
-            returns_array, (1 - self.p.cvar_confidence_level) * 100
-        )
-        cvar_returns = returns_array[returns_array <= var_threshold]
-        self.current_cvar = abs(np.mean(cvar_returns)) if len(cvar_returns) > 0 else 0.0
+        if recompute:
+            returns_array = self.returns_history.values()
+            _, self.current_cvar = self._tail_risk(
+                returns_array, self.p.cvar_confidence_level
+            )
 
         # 检查CVaR违规
         if self.current_cvar > self.p.risk_budget_limit:
@@ -175,8 +294,7 @@ class RealTimeRiskMonitor(bt.Analyzer):
         if not self.start_value:
             return
 
-        current_value = self.strategy.broker.getvalue()
-        total_return = (current_value - self.start_value) / self.start_value
+        total_return = (self.current_value - self.start_value) / self.start_value
         self.risk_budget_used = abs(total_return)
 
         if self.risk_budget_used > self.p.risk_budget_limit:
@@ -186,12 +304,13 @@ class RealTimeRiskMonitor(bt.Analyzer):
                 f"风险预算超支: 已用{self.risk_budget_used:.2%} > 限制{self.p.risk_budget_limit:.2%}",
             )
 
-    def _perform_stress_tests(self):
+    def _perform_stress_tests(self, current_value=None):
         """执行压力测试"""
         if not self.p.enable_stress_testing:
             return
 
-        current_value = self.strategy.broker.getvalue()
+        if current_value is None:
+            current_value = self.strategy.broker.getvalue()
 
         stress_results = {}
         for scenario_name, shock in self.stress_scenarios.items():
@@ -234,7 +353,7 @@ class RealTimeRiskMonitor(bt.Analyzer):
             "timestamp": self.strategy.datetime.datetime(),
             "type": alert_type,
             "message": message,
-            "portfolio_value": self.strategy.broker.getvalue(),
+            "portfolio_value": self.current_value,
             "drawdown": self.current_drawdown,
             "var": self.current_var,
             "cvar": self.current_cvar,
@@ -281,6 +400,10 @@ class RealTimeRiskMonitor(bt.Analyzer):
         self.returns_history.clear()
         self.portfolio_values.clear()
         self.drawdown_history.clear()
+        self._peak_window.clear()
+        self._value_count = 0
+        self._bars_since_tail = 0
+        self._tail_drift = 0.0
         self.alerts.clear()
         self.circuit_breaker_triggered = False
         self.var_violations = 0
@@ -7,8 +7,27 @@ Based on the detailed technical implementation roadmap
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import numpy as np
+
 import backtrader as bt
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # numba 为可选依赖
+
+
+def _atr_py(high, low, prev_close):
+    """真实波幅 (True Range) 的均值"""
+    true_range = np.maximum(
+        high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+    return true_range.mean()
+
+
+# numba 可用时使用JIT编译版本（首次调用时编译，并缓存到磁盘）
+_atr_kernel = njit(cache=True)(_atr_py) if njit else _atr_py
+
 
 class RiskBasedSizer(bt.Sizer):
     """
@@ -25,6 +44,10 @@ class RiskBasedSizer(bt.Sizer):
         ("_debug", False),  # 调试模式
     )
 
+    def __init__(self):
+        # ATR 输入的常驻缓冲区（high/low/prev_close 各一行），每根K线原地填充
+        self._atr_buf = np.empty((3, self.p.volatility_period), dtype=np.float64)
+
     def _getsizing(self, comminfo, cash, data, isbuy):
         """
         计算仓位大小的核心方法
@@ -98,26 +121,20 @@ class RiskBasedSizer(bt.Sizer):
         Returns:
             float: ATR值
         """
-        if len(data) < period + 1:
+        # 使用前 period 根K线（不含当前K线），每根都需要其前一根的收盘价
+        if len(data) < period + 2:
             return 0
 
-        atr_sum = 0
-        for i in range(period):
-            # 计算真实波幅 (True Range)
-            high = data.high[-(i + 1)]
-            low = data.low[-(i + 1)]
-            prev_close = (
-                data.close[-(i + 2)] if i + 2 <= len(data) else data.close[-(i + 1)]
-            )
-
-            tr1 = high - low
-            tr2 = abs(high - prev_close)
-            tr3 = abs(low - prev_close)
+        buf = self._atr_buf
+        if buf.shape[1] != period:
+            buf = self._atr_buf = np.empty((3, period), dtype=np.float64)
 
-            true_range = max(tr1, tr2, tr3)
-            atr_sum += true_range
+        high, low, prev_close = buf
+        high[:] = data.high.get(ago=-1, size=period)
+        low[:] = data.low.get(ago=-1, size=period)
+        prev_close[:] = data.close.get(ago=-2, size=period)
 
-        return atr_sum / period
+        return float(_atr_kernel(high, low, prev_close))
 
     def _adjust_for_costs(self, size, comminfo, data, cash):
         """
@@ -42,6 +42,7 @@ def download_command(args) -> int:
                 period=args.timeframe,
                 reverse=args.reverse,
                 proxy=args.proxy,
+                use_cache=args.cache,
             )
         elif args.source == "akshare":
             downloader = AkShareDownloader(
@@ -51,6 +52,7 @@ def download_command(args) -> int:
                 period=args.period,
                 adjust=args.adjust,
                 market=args.market,
+                use_cache=args.cache,
             )
         elif args.source == "ccxt":
             proxies = None
@@ -145,6 +147,12 @@ Examples:
         "--reverse", action="store_true", default=False, help="Reverse data order"
     )
     yahoo_parser.add_argument("--proxy", help="Proxy URL")
+    yahoo_parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Use the local parquet cache (~/.cache/backtrader/yahoo); "
+        "cached adjusted prices are not refreshed after dividends or splits",
+    )
     yahoo_parser.add_argument("--outfile", required=True, help="Output file path")
 
     # akshare 子命令
@@ -172,6 +180,12 @@ Examples:
         choices=["qfq", "hfq", ""],
         help="Price adjustment: qfq=前复权, hfq=后复权, empty=不复权",
     )
+    akshare_parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Use the local parquet cache (~/.cache/akshare); "
+        "only unadjusted (--adjust '') stock data is cached",
+    )
     akshare_parser.add_argument("--outfile", required=True, help="Output file path")
 
     # ccxt 子命令
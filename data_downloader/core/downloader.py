@@ -9,6 +9,7 @@ Core Downloader Base Class
 import abc
 import datetime
 import io
+import shutil
 from typing import Optional, Union
 
 
@@ -17,6 +18,10 @@ class BaseDownloader(abc.ABC):
 
     def __init__(self):
         self.datafile: Optional[io.StringIO] = None
+        # 下载结果 DataFrame；设置后由 pandas 直接写出，无需经 StringIO 中转
+        self.df = None
+        # 流式下载器的写出目标（文件路径或文件对象），数据本身不在内存中保留
+        self.output: Optional[Union[str, io.TextIOBase]] = None
         self.error: Optional[str] = None
 
     @abc.abstractmethod
@@ -72,21 +77,27 @@ class BaseDownloader(abc.ABC):
         Args:
             output_file: 输出文件路径或文件对象
         """
-        if not self.datafile:
+        if self.df is None and not self.datafile:
             raise RuntimeError("No data to write")
 
         if isinstance(output_file, str):
             # 字符串路径 - 打开文件
             with io.open(output_file, "w", encoding="utf-8") as f:
-                self.datafile.seek(0)
-                f.write(self.datafile.getvalue())
-        else:
+                self._write_data(f)
+        elif hasattr(output_file, "write"):
             # 文件对象
+            self._write_data(output_file)
+        else:
+            raise TypeError("output_file must be a string path or file-like object")
+
+    def _write_data(self, f) -> None:
+        """将数据写入已打开的文件对象"""
+        if self.df is not None:
+            self.df.to_csv(f, index=False)
+        else:
+            # 按 1 MiB 分块复制，不再先用 getvalue() 生成整份字符串副本
             self.datafile.seek(0)
-            if hasattr(output_file, "write"):
-                output_file.write(self.datafile.getvalue())
-            else:
-                raise TypeError("output_file must be a string path or file-like object")
+            shutil.copyfileobj(self.datafile, f, length=1 << 20)
 
     def get_data_as_string(self) -> str:
         """
@@ -98,6 +109,20 @@ class BaseDownloader(abc.ABC):
         Raises:
             RuntimeError: 没有可用数据
         """
+        if self.df is not None:
+            return self.df.to_csv(index=False)
+
+        if isinstance(self.output, str):
+            # 已写出到文件的数据从文件读回
+            with io.open(self.output, "r", encoding="utf-8") as f:
+                return f.read()
+
+        if hasattr(self.output, "getvalue"):
+            return self.output.getvalue()
+
+        if self.output is not None:
+            raise RuntimeError("Data was written to a file object and is not retained")
+
         if not self.datafile:
             raise RuntimeError("No data available")
 
@@ -111,7 +136,12 @@ class BaseDownloader(abc.ABC):
         Returns:
             bool: True表示成功，False表示失败
         """
-        return self.datafile is not None and self.error is None
+        has_data = (
+            self.df is not None
+            or self.datafile is not None
+            or self.output is not None
+        )
+        return has_data and self.error is None
 
     def get_error(self) -> Optional[str]:
         """
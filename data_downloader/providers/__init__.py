@@ -4,15 +4,21 @@
 Providers Module Init
 """
 
-from .akshare import AkShareDownloader, download_akshare_data
+from .akshare import (
+    AkShareDownloader,
+    batch_download_akshare_data,
+    download_akshare_data,
+)
 from .ccxt import CCXTDownloader, download_ccxt_data
-from .yahoo import YahooDownloader, download_yahoo_data
+from .yahoo import YahooDownloader, download_yahoo_data, load_yahoo_dataframe
 
 __all__ = [
     "YahooDownloader",
     "AkShareDownloader",
     "CCXTDownloader",
     "download_yahoo_data",
+    "load_yahoo_dataframe",
     "download_akshare_data",
+    "batch_download_akshare_data",
     "download_ccxt_data",
 ]
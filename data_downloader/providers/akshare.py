@@ -6,11 +6,18 @@ AkShare Data Downloader
 基于 AkShare 库的数据下载器，支持中国A股、指数、基金、期货等市场数据下载。
 """
 
-import io
+import datetime
+import hashlib
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 
 from ..core.downloader import BaseDownloader
 
+# 下载结果的本地 parquet 缓存目录（需要 pyarrow 才会写入）
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "akshare")
+
 
 class AkShareDownloader(BaseDownloader):
     """AkShare 数据下载器"""
@@ -23,6 +30,7 @@ class AkShareDownloader(BaseDownloader):
         period: str = "daily",
         adjust: str = "qfq",
         market: str = "stock",
+        use_cache: bool = False,
     ):
         """
         初始化 AkShare 数据下载器
@@ -34,6 +42,7 @@ class AkShareDownloader(BaseDownloader):
             period: 数据频率 ('daily', 'weekly', 'monthly')
             adjust: 价格调整方式 ('qfq'=前复权, 'hfq'=后复权, ''=不复权)
             market: 市场类型 ('stock', 'index', 'fund', 'futures', 'foreign_futures')
+            use_cache: 是否使用本地 parquet 缓存（仅缓存不复权数据）
         """
         super().__init__()
 
@@ -55,6 +64,7 @@ class AkShareDownloader(BaseDownloader):
         self.period = period
         self.adjust = adjust
         self.market = market
+        self.use_cache = use_cache
         self.ak = ak
 
         logging.info(
@@ -73,7 +83,7 @@ class AkShareDownloader(BaseDownloader):
         """
         try:
             # 下载数据
-            if not self._fetch_data():
+            if not self.fetch():
                 return False
 
             # 写入输出文件
@@ -86,8 +96,71 @@ class AkShareDownloader(BaseDownloader):
             logging.error(self.error)
             return False
 
+    def fetch(self) -> bool:
+        """
+        获取数据但不写出文件，成功后结果保存在 self.df
+
+        Returns:
+            bool: 获取是否成功
+        """
+        return self._fetch_data()
+
+    def _cache_path(self) -> str:
+        """本次请求对应的缓存文件路径"""
+        key = "|".join(
+            [
+                self.symbol,
+                self.market,
+                self.period,
+                self.adjust,
+                self.fromdate.strftime("%Y%m%d"),
+                self.todate.strftime("%Y%m%d"),
+            ]
+        )
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(CACHE_DIR, digest + ".parquet")
+
+    def _cacheable(self) -> bool:
+        """
+        本次请求的数据能否缓存
+
+        前复权/后复权价格会随之后的分红送转改写历史数据，只缓存不复权的股票数据；
+        指数、基金、期货接口不做复权
+        """
+        return self.market != "stock" or not self.adjust
+
+    def _load_cache(self) -> bool:
+        """从本地缓存读取数据，成功返回 True"""
+        if not self._cacheable():
+            return False
+
+        try:
+            import pandas as pd
+
+            self.df = pd.read_parquet(self._cache_path())
+        except Exception:
+            return False  # 缓存不存在或缺少 pyarrow
+
+        self.error = None
+        logging.info(f"Loaded {len(self.df)} rows of {self.symbol} from cache")
+        return True
+
+    def _save_cache(self) -> None:
+        """写入本地缓存；区间未结束的数据仍可能变化，不缓存"""
+        if not self._cacheable() or self.todate.date() >= datetime.date.today():
+            return
+
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            self.df.to_parquet(self._cache_path(), index=False)
+        except Exception as e:
+            logging.debug(f"Skipping AkShare cache write: {e}")
+
     def _fetch_data(self) -> bool:
         """获取数据"""
+        if self.use_cache and self._load_cache():
+            return True
+
         try:
             df = None
 
@@ -129,6 +202,19 @@ class AkShareDownloader(BaseDownloader):
                 # 国际期货数据
                 logging.info(f"Downloading foreign futures {self.symbol}")
                 df = self.ak.futures_foreign_hist(symbol=self.symbol)
+                if df is not None:
+                    import pandas as pd
+
+                    try:
+                        # 转为 Arrow 后端列；不把取整的浮点列转成整数，输出数值格式不变
+                        df = df.convert_dtypes(
+                            dtype_backend="pyarrow", convert_integer=False
+                        )
+                    except (ImportError, TypeError, ValueError):
+                        pass  # pandas < 2.0 或缺少 pyarrow 时保持原列类型
+                    # 日期列显式转为 datetime64，不再保留为字符串
+                    if "date" in df.columns:
+                        df["date"] = pd.to_datetime(df["date"])
 
             else:
                 self.error = f"Unsupported market type: {self.market}"
@@ -155,25 +241,41 @@ class AkShareDownloader(BaseDownloader):
                 "volume": "Volume",
             }
 
-            # 重命名列
-            df = df.rename(columns=column_mapping)
-
-            # 选择需要的列
-            required_cols = ["Date", "Open", "High", "Low", "Close", "Volume"]
-            available_cols = [col for col in required_cols if col in df.columns]
-            df = df[available_cols]
+            # 重命名列（直接替换列索引，避免 rename 复制整个 DataFrame）
+            df.columns = [column_mapping.get(c, c) for c in df.columns]
 
-            # 添加 OpenInterest 列
-            if "OpenInterest" not in df.columns:
-                df["OpenInterest"] = 0
+            # 部分接口返回全量历史，按请求区间过滤（datetime64 向量化比较）
+            if "Date" in df.columns:
+                import pandas as pd
 
-            # 转换 DataFrame 为 CSV 格式
-            csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer, index=False)
-            csv_buffer.seek(0)
+                dates = pd.to_datetime(df["Date"])
+                df = df.loc[(dates >= self.fromdate) & (dates <= self.todate)]
+                if df.empty:
+                    self.error = (
+                        f"No data found for symbol {self.symbol} "
+                        f"between {self.fromdate.date()} and {self.todate.date()}"
+                    )
+                    return False
+
+            # 一次 reindex 完成列选择，并补齐 OpenInterest 等缺失列（填0）
+            df = df.reindex(
+                columns=[
+                    "Date",
+                    "Open",
+                    "High",
+                    "Low",
+                    "Close",
+                    "Volume",
+                    "OpenInterest",
+                ],
+                fill_value=0,
+            )
 
-            self.datafile = csv_buffer
+            # 保留 DataFrame，写出时由 pandas 直接生成 CSV
+            self.df = df
             self.error = None
+            if self.use_cache:
+                self._save_cache()
             logging.info(f"Successfully downloaded {len(df)} rows of data")
             return True
 
@@ -194,6 +296,7 @@ def download_akshare_data(
     period: str = "daily",
     adjust: str = "qfq",
     market: str = "stock",
+    use_cache: bool = False,
 ) -> bool:
     """
     便捷函数：下载 AkShare 数据
@@ -206,6 +309,7 @@ def download_akshare_data(
         period: 数据频率
         adjust: 价格调整方式
         market: 市场类型
+        use_cache: 是否使用本地 parquet 缓存（仅缓存不复权数据）
 
     Returns:
         bool: 下载是否成功
@@ -217,5 +321,47 @@ def download_akshare_data(
         period=period,
         adjust=adjust,
         market=market,
+        use_cache=use_cache,
     )
     return downloader.download(output_file)
+
+
+def batch_download_akshare_data(
+    specs: List[Dict[str, Any]], max_workers: int = 4
+) -> List[Any]:
+    """
+    便捷函数：在同一进程内批量下载 AkShare 数据
+
+    akshare 只导入一次，各标的的网络请求在线程池中并行执行；
+    开启本地缓存（spec 中 use_cache=True）时，重复的请求不再访问网络
+
+    Args:
+        specs: 下载参数列表，每项为 AkShareDownloader 的关键字参数
+            (symbol, fromdate, todate 必填)
+        max_workers: 并行下载线程数
+
+    Returns:
+        List[DataFrame]: 与 specs 顺序一致的结果列表，下载失败的项为 None
+
+    Raises:
+        ValueError: 参数项缺少必填字段（在开始下载前检查）
+    """
+    for i, spec in enumerate(specs):
+        missing = [k for k in ("symbol", "fromdate", "todate") if k not in spec]
+        if missing:
+            raise ValueError(f"specs[{i}] is missing {', '.join(missing)}")
+
+    def fetch(spec):
+        try:
+            downloader = AkShareDownloader(**spec)
+            if downloader.fetch():
+                return downloader.df
+            error = downloader.error
+        except Exception as e:
+            error = str(e)
+
+        logging.error(f"Batch download failed for {spec['symbol']}: {error}")
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fetch, specs))
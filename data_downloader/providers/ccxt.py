@@ -6,17 +6,64 @@ CCXT Data Downloader
 基于 CCXT 库的数据下载器，支持 200+ 加密货币交易所数据下载。
 """
 
-import datetime
-import io
+import asyncio
 import logging
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 
+import numpy as np
+
 from ..core.downloader import BaseDownloader
 
+# 已加载的交易所市场信息 {exchange: (markets, currencies)}，跨下载器实例复用，
+# 批量下载多个交易对时只需请求一次 load_markets
+_MARKETS_CACHE: Dict[str, tuple] = {}
+
+
+def _format_timestamps(timestamps):
+    """
+    将毫秒时间戳数组格式化为 'YYYY-MM-DD HH:MM:SS' 字符串
+
+    日期和日内时刻分开处理：各自只格式化出现过的唯一值，再按索引拼接，
+    不为每一行构造 Timestamp 对象
+    """
+    days, seconds = np.divmod(timestamps // 1000, 86400)
+    days, day_index = np.unique(days, return_inverse=True)
+    seconds, second_index = np.unique(seconds, return_inverse=True)
+
+    dates = np.datetime_as_string(days.astype("datetime64[D]"))
+    times = np.datetime_as_string(seconds.astype("datetime64[s]"), unit="s")
+    times = np.char.replace(times, "1970-01-01T", " ")
+
+    return np.char.add(dates[day_index], times[second_index])
+
+
+def _format_csv_rows(page):
+    """
+    将一页 K 线 (timestamp, open, high, low, close, volume) 格式化为 CSV 行
+
+    数值使用与 pandas.to_csv 相同的最短表示，NaN 输出为空
+    """
+    columns = [_format_timestamps(page[:, 0].astype(np.int64)).tolist()]
+    for i in range(1, 6):
+        values = page[:, i]
+        columns.append(np.where(np.isnan(values), "", values.astype(str)).tolist())
+
+    return "".join(
+        f"{date},{open_},{high},{low},{close},{volume},0\n"
+        for date, open_, high, low, close, volume in zip(*columns)
+    )
+
 
 class CCXTDownloader(BaseDownloader):
     """CCXT 加密货币数据下载器"""
 
+    limit = 1000  # CCXT 通常限制每次请求的数量
+    burst = 5  # 节流令牌桶容量：开始时可连续发出的请求数，之后仍按 rateLimit 间隔
+
     def __init__(
         self,
         exchange: str,
@@ -42,9 +89,9 @@ class CCXTDownloader(BaseDownloader):
         # 验证日期
         from_dt, to_dt = self._validate_dates(fromdate, todate)
 
-        # 导入依赖
+        # 导入依赖（异步接口，分块请求可并发等待）
         try:
-            import ccxt
+            import ccxt.async_support as ccxt_async
         except ImportError:
             raise ImportError(
                 "CCXT data downloader requires ccxt module. "
@@ -58,22 +105,31 @@ class CCXTDownloader(BaseDownloader):
         self.timeframe = timeframe
         self.proxies = proxies
 
-        # 创建交易所实例
+        # 交易所配置；enableRateLimit 由 ccxt 令牌桶节流器按 rateLimit 补充令牌。
+        # 默认桶为空、容量为 1（每个请求都要等待间隔），这里预先装满 burst 个令牌，
+        # 并发的窗口请求可先用满额度，持续速率不变
         try:
-            exchange_class = getattr(ccxt, exchange)
-            self.exchange = (
-                exchange_class({"enableRateLimit": True, "proxies": proxies})
-                if proxies
-                else exchange_class({"enableRateLimit": True})
-            )
+            self._exchange_class = getattr(ccxt_async, exchange)
+            self._exchange_config = {
+                "enableRateLimit": True,
+                "tokenBucket": {"capacity": self.burst, "tokens": self.burst - 1},
+            }
+            if proxies:
+                # 异步客户端基于 aiohttp，只接受单个代理地址
+                self._exchange_config["aiohttp_proxy"] = (
+                    proxies.get("https") or proxies.get("http")
+                )
 
-            # 检查交易所是否支持 OHLCV
-            if not self.exchange.has["fetchOHLCV"]:
+            # 检查交易所是否支持 OHLCV（实例尚未建立连接，无需关闭）
+            if not self._create_exchange().has["fetchOHLCV"]:
                 raise ValueError(f"Exchange {exchange} does not support OHLCV data")
 
         except Exception as e:
             raise ValueError(f"Failed to initialize exchange {exchange}: {str(e)}")
 
+        # 异步客户端绑定创建它的事件循环，每次下载新建实例、结束后关闭
+        self.exchange = None
+
         logging.info(
             f"Initialized CCXTDownloader for {symbol} on {exchange} from {fromdate} to {todate}"
         )
@@ -82,19 +138,45 @@ class CCXTDownloader(BaseDownloader):
         """
         下载数据到指定文件
 
+        数据按时间窗口逐个写出，内存占用与历史长度无关
+
         Args:
             output_file: 输出文件路径或文件对象
 
         Returns:
             bool: 下载是否成功
         """
+        self.output = None
         try:
-            # 下载数据
-            if not self._fetch_data():
+            if isinstance(output_file, str):
+                # 字符串路径 - 先写入同目录下的临时文件，成功后再替换目标文件；
+                # 下载失败时只删除临时文件，已有的数据文件保持不变
+                directory, name = os.path.split(os.path.abspath(output_file))
+                tmp_name = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+                # 以 0666 创建，由系统按进程 umask 得到普通文件权限
+                fd = os.open(tmp_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+                try:
+                    with open(fd, "w", encoding="utf-8") as tmp:
+                        success = self._fetch_data(tmp)
+                    if success:
+                        # 替换已有文件时保留其原有权限
+                        if os.path.exists(output_file):
+                            shutil.copymode(output_file, tmp_name)
+                        os.replace(tmp_name, output_file)
+                finally:
+                    if os.path.exists(tmp_name):
+                        os.remove(tmp_name)
+            elif hasattr(output_file, "write"):
+                # 文件对象
+                success = self._fetch_data(output_file)
+            else:
+                raise TypeError("output_file must be a string path or file-like object")
+
+            if not success:
                 return False
 
-            # 写入输出文件
-            self._write_output(output_file)
+            # 数据已流式写出，不在内存中保留；记录写出目标供 get_data_as_string 使用
+            self.output = output_file
             logging.info("Data download completed successfully")
             return True
 
@@ -103,76 +185,19 @@ class CCXTDownloader(BaseDownloader):
             logging.error(self.error)
             return False
 
-    def _fetch_data(self) -> bool:
-        """获取数据"""
+    def _fetch_data(self, f) -> bool:
+        """获取数据并写入已打开的文件对象"""
         try:
-            # 转换日期为毫秒时间戳
-            since = int(self.fromdate.timestamp() * 1000)
-            to_timestamp = int(self.todate.timestamp() * 1000)
-
-            all_ohlcv = []
-            limit = 1000  # CCXT 通常限制每次请求的数量
-
             logging.info(f"Downloading {self.symbol} data from {self.exchange_name}")
 
-            while since < to_timestamp:
-                # 获取 OHLCV 数据
-                ohlcv = self.exchange.fetch_ohlcv(
-                    symbol=self.symbol,
-                    timeframe=self.timeframe,
-                    since=since,
-                    limit=limit,
-                )
-
-                if not ohlcv:
-                    break
-
-                # 过滤时间范围内的数据
-                filtered_ohlcv = [
-                    candle for candle in ohlcv if candle[0] <= to_timestamp
-                ]
-                all_ohlcv.extend(filtered_ohlcv)
-
-                # 更新 since 为最后一条数据的时间 + 1
-                since = ohlcv[-1][0] + 1
+            rows = self._run(self._fetch_all(f))
 
-                # 如果返回的数据少于限制，说明已经到达最新数据
-                if len(ohlcv) < limit:
-                    break
-
-            if not all_ohlcv:
+            if not rows:
                 self.error = f"No data found for {self.symbol}"
                 return False
 
-            # 转换为 pandas DataFrame 进行处理
-            try:
-                import pandas as pd
-            except ImportError:
-                # 如果没有 pandas，手动处理
-                return self._process_without_pandas(all_ohlcv)
-
-            # 使用 pandas 处理数据
-            df = pd.DataFrame(
-                all_ohlcv,
-                columns=["timestamp", "Open", "High", "Low", "Close", "Volume"],
-            )
-            df["Date"] = pd.to_datetime(df["timestamp"], unit="ms")
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d %H:%M:%S")
-
-            # 重新排序列
-            df = df[["Date", "Open", "High", "Low", "Close", "Volume"]]
-
-            # 添加 OpenInterest 列
-            df["OpenInterest"] = 0
-
-            # 转换为 CSV 格式
-            csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer, index=False)
-            csv_buffer.seek(0)
-
-            self.datafile = csv_buffer
             self.error = None
-            logging.info(f"Successfully downloaded {len(df)} candles")
+            logging.info(f"Successfully downloaded {rows} candles")
             return True
 
         except Exception as e:
@@ -183,36 +208,123 @@ class CCXTDownloader(BaseDownloader):
             logging.error(traceback.format_exc())
             return False
 
-    def _process_without_pandas(self, ohlcv_data) -> bool:
-        """不使用 pandas 处理数据"""
+    def _create_exchange(self):
+        """创建交易所异步客户端实例"""
+        return self._exchange_class(dict(self._exchange_config))
+
+    @staticmethod
+    def _run(coro):
+        """
+        同步运行协程
+
+        调用方已在事件循环中（如 Jupyter、异步代码）时无法嵌套 asyncio.run，
+        改为在工作线程的独立事件循环中运行并等待结果
+        """
         try:
-            # 手动格式化数据
-            lines = ["Date,Open,High,Low,Close,Volume,OpenInterest\n"]
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
 
-            for candle in ohlcv_data:
-                timestamp, open_price, high_price, low_price, close_price, volume = (
-                    candle[:6]
-                )
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
 
-                # 转换时间戳为日期字符串
-                dt = datetime.datetime.fromtimestamp(timestamp / 1000)
-                date_str = dt.strftime("%Y-%m-%d %H:%M:%S")
+    async def _fetch_all(self, f) -> int:
+        """按时间窗口并发获取全部 K 线，按时间顺序逐窗口写出，返回总行数"""
+        # 转换日期为毫秒时间戳
+        since = int(self.fromdate.timestamp() * 1000)
+        to_timestamp = int(self.todate.timestamp() * 1000)
 
-                line = f"{date_str},{open_price},{high_price},{low_price},{close_price},{volume},0\n"
-                lines.append(line)
+        self.exchange = self._create_exchange()
 
-            csv_buffer = io.StringIO()
-            csv_buffer.writelines(lines)
-            csv_buffer.seek(0)
+        # 每个窗口是一次满额请求覆盖的时间跨度，窗口边界可预先算出
+        tf_ms = self.exchange.parse_timeframe(self.timeframe) * 1000
+        span = tf_ms * self.limit
 
-            self.datafile = csv_buffer
-            self.error = None
-            logging.info(f"Successfully downloaded {len(ohlcv_data)} candles")
-            return True
+        rows = 0
+        windows = []
+        try:
+            await self._load_markets()
+            windows = [
+                asyncio.ensure_future(
+                    self._fetch_window(
+                        start, min(start + span, to_timestamp + 1), tf_ms
+                    )
+                )
+                for start in range(since, to_timestamp + 1, span)
+            ]
+
+            # 窗口按时间顺序且互不重叠：依次等待并立即写出，写出后不再保留。
+            # 写出顺序即时间顺序，无需排序；交易所返回乱序数据时中止下载
+            last_ts = float("-inf")
+            for window in windows:
+                for page in await window:
+                    if page[0, 0] <= last_ts:
+                        raise ValueError(
+                            f"{self.exchange_name} returned {self.symbol} candles "
+                            "out of order"
+                        )
+                    last_ts = page[-1, 0]
+
+                    if not rows:
+                        f.write("Date,Open,High,Low,Close,Volume,OpenInterest\n")
+                    f.write(_format_csv_rows(page))
+                    rows += len(page)
+        finally:
+            # 出错时取消尚未完成的窗口，并回收其结果
+            for window in windows:
+                window.cancel()
+            await asyncio.gather(*windows, return_exceptions=True)
+            await self.exchange.close()
+
+        return rows
+
+    async def _load_markets(self) -> None:
+        """加载市场信息；同一交易所只请求一次，之后从缓存恢复"""
+        cached = _MARKETS_CACHE.get(self.exchange_name)
+        if cached is not None:
+            self.exchange.set_markets(*cached)
+            return
+
+        await self.exchange.load_markets()
+        _MARKETS_CACHE[self.exchange_name] = (
+            self.exchange.markets,
+            self.exchange.currencies,
+        )
 
-        except Exception as e:
-            self.error = f"Error processing data without pandas: {str(e)}"
-            return False
+    async def _fetch_window(self, since: int, until: int, tf_ms: int) -> list:
+        """获取 [since, until) 内的 K 线；交易所单次上限低于 limit 时继续翻页"""
+        pages = []
+        last_ts = since - 1
+
+        while since < until:
+            # 获取 OHLCV 数据
+            ohlcv = await self.exchange.fetch_ohlcv(
+                symbol=self.symbol,
+                timeframe=self.timeframe,
+                since=since,
+                limit=self.limit,
+            )
+
+            if not ohlcv:
+                break
+
+            # 返回数据按时间升序：二分定位，只保留晚于上一页末尾且早于窗口终点的部分
+            page = np.asarray(ohlcv, dtype=np.float64)
+            ts = page[:, 0]
+            page = page[
+                np.searchsorted(ts, last_ts, side="right") : np.searchsorted(ts, until)
+            ]
+            if len(page):
+                pages.append(page)
+                last_ts = page[-1, 0]
+
+            # 下一根 K 线已超出窗口、或交易所没有返回更新的数据时结束，
+            # 否则从最后一条数据的时间 + 1 继续
+            if ohlcv[-1][0] + tf_ms >= until or ohlcv[-1][0] < since:
+                break
+            since = ohlcv[-1][0] + 1
+
+        return pages
 
 
 def download_ccxt_data(
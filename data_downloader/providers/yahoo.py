@@ -6,7 +6,9 @@ Yahoo Finance Data Downloader
 基于 yfinance 库的数据下载器，支持全球股票、指数、期货、外汇和加密货币数据下载。
 """
 
-import io
+import datetime
+import functools
+import hashlib
 import logging
 import os
 import time
@@ -14,6 +16,10 @@ from typing import Optional
 
 from ..core.downloader import BaseDownloader
 
+# 下载结果的本地 parquet 缓存目录（需要 pyarrow 才会写入）。
+# yfinance 返回复权价格，之后的分红拆股会改写历史数据，缓存默认关闭
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "backtrader", "yahoo")
+
 
 class YahooDownloader(BaseDownloader):
     """Yahoo Finance 数据下载器"""
@@ -26,6 +32,7 @@ class YahooDownloader(BaseDownloader):
         period: str = "d",
         reverse: bool = False,
         proxy: Optional[str] = None,
+        use_cache: bool = False,
     ):
         """
         初始化 Yahoo 数据下载器
@@ -37,6 +44,7 @@ class YahooDownloader(BaseDownloader):
             period: 时间周期 ('d'=日, 'w'=周, 'm'=月)
             reverse: 是否反转数据顺序
             proxy: 代理服务器地址 (如 'http://127.0.0.1:7890')
+            use_cache: 是否使用本地 parquet 缓存（复权价格可能过时，适合演示和测试）
         """
         super().__init__()
 
@@ -72,8 +80,10 @@ class YahooDownloader(BaseDownloader):
         # 格式化日期
         self.start_date = from_dt.strftime("%Y-%m-%d")
         self.end_date = to_dt.strftime("%Y-%m-%d")
+        self.todate = to_dt
         self.ticker = ticker
         self.reverse = reverse
+        self.use_cache = use_cache
         self.yf = yf
 
         logging.info(
@@ -92,7 +102,7 @@ class YahooDownloader(BaseDownloader):
         """
         try:
             # 下载数据
-            if not self._fetch_data():
+            if not self.fetch():
                 return False
 
             # 写入输出文件
@@ -104,12 +114,63 @@ class YahooDownloader(BaseDownloader):
             self.error = f"Download failed: {str(e)}"
             logging.error(self.error)
             return False
+
+    def fetch(self) -> bool:
+        """
+        获取数据但不写出文件，成功后结果保存在 self.df
+
+        Returns:
+            bool: 获取是否成功
+        """
+        try:
+            return self._fetch_data()
         finally:
             # 恢复原始代理设置
             self._restore_proxy_settings()
 
+    def _cache_path(self) -> str:
+        """本次请求对应的缓存文件路径"""
+        key = "|".join(
+            [
+                self.ticker,
+                self.interval,
+                self.start_date,
+                self.end_date,
+                str(self.reverse),
+            ]
+        )
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(CACHE_DIR, digest + ".parquet")
+
+    def _load_cache(self) -> bool:
+        """从本地缓存读取数据，成功返回 True"""
+        try:
+            import pandas as pd
+
+            self.df = pd.read_parquet(self._cache_path())
+        except Exception:
+            return False  # 缓存不存在或缺少 pyarrow
+
+        self.error = None
+        logging.info(f"Loaded {len(self.df)} rows of {self.ticker} from cache")
+        return True
+
+    def _save_cache(self) -> None:
+        """写入本地缓存；区间未结束的数据仍可能变化，不缓存"""
+        if self.todate.date() >= datetime.date.today():
+            return
+
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            self.df.to_parquet(self._cache_path(), index=False)
+        except Exception as e:
+            logging.debug(f"Skipping Yahoo cache write: {e}")
+
     def _fetch_data(self) -> bool:
         """获取数据"""
+        if self.use_cache and self._load_cache():
+            return True
+
         df = None
         retries = 3
 
@@ -157,24 +218,15 @@ class YahooDownloader(BaseDownloader):
             return False
 
         try:
-            # 转换 DataFrame 为 CSV 格式
-            csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer)
-            csv_buffer.seek(0)
-
-            # 可选地反转数据
+            # 可选地反转数据（直接反向切片，不再回读 CSV 文本逐行反转）
             if self.reverse:
-                lines = csv_buffer.readlines()
-                header = lines[0]
-                data_lines = lines[1:]
-                data_lines.reverse()
-                csv_buffer = io.StringIO()
-                csv_buffer.write(header)
-                csv_buffer.writelines(data_lines)
-                csv_buffer.seek(0)
-
-            self.datafile = csv_buffer
+                df = df.iloc[::-1]
+
+            # 保留 DataFrame（日期索引转为列），写出时由 pandas 直接生成 CSV
+            self.df = df.reset_index()
             self.error = None
+            if self.use_cache:
+                self._save_cache()
             logging.info(f"Successfully downloaded {len(df)} rows of data")
             return True
 
@@ -197,6 +249,48 @@ class YahooDownloader(BaseDownloader):
                 os.environ.pop("HTTPS_PROXY", None)
 
 
+@functools.lru_cache(maxsize=16)
+def load_yahoo_dataframe(
+    ticker: str,
+    fromdate: str,
+    todate: str,
+    period: str = "d",
+    use_cache: bool = False,
+):
+    """
+    便捷函数：获取 Yahoo Finance 数据为以日期为索引的 DataFrame
+
+    同一进程内相同参数只获取一次；返回的是共享的缓存对象，修改前请先 copy()
+
+    Args:
+        ticker: 股票代码
+        fromdate: 开始日期 (YYYY-MM-DD)
+        todate: 结束日期 (YYYY-MM-DD)
+        period: 时间周期
+        use_cache: 是否同时使用本地 parquet 缓存（跨进程复用）
+
+    Returns:
+        DataFrame: 日期索引（无时区）的 OHLCV 数据
+
+    Raises:
+        RuntimeError: 获取失败
+    """
+    downloader = YahooDownloader(
+        ticker=ticker,
+        fromdate=fromdate,
+        todate=todate,
+        period=period,
+        use_cache=use_cache,
+    )
+    if not downloader.fetch():
+        raise RuntimeError(f"Yahoo Finance download failed: {downloader.error}")
+
+    df = downloader.df.set_index(downloader.df.columns[0])
+    if getattr(df.index, "tz", None) is not None:
+        df.index = df.index.tz_localize(None)
+    return df
+
+
 def download_yahoo_data(
     ticker: str,
     fromdate: str,
@@ -29,6 +29,11 @@ class BinanceLocalTest(bt.Strategy):
         # 添加简单移动平均线
         self.sma = bt.indicators.SMA(self.data, period=self.p.sma_period)
 
+        # 交叉信号在 runonce 模式下由线运算一次性批量计算，next() 只读取结果
+        close = self.data.close
+        self.cross_up = bt.And(close > self.sma, close(-1) <= self.sma(-1))
+        self.cross_down = bt.And(close < self.sma, close(-1) >= self.sma(-1))
+
         # 订单和持仓变量
         self.order = None
 
@@ -96,13 +101,13 @@ class BinanceLocalTest(bt.Strategy):
         # 检查是否在市场中
         if not self.position:
             # SMA向上交叉时买入
-            if self.data.close[0] > self.sma[0] and self.data.close[-1] <= self.sma[-1]:
+            if self.cross_up[0]:
                 self.log("BUY CREATE, %.2f" % self.data.close[0])
                 self.order = self.buy(size=self.p.trade_size)
 
         else:
             # 持仓时，SMA向下交叉时卖出
-            if self.data.close[0] < self.sma[0] and self.data.close[-1] >= self.sma[-1]:
+            if self.cross_down[0]:
                 self.log("SELL CREATE, %.2f" % self.data.close[0])
                 self.order = self.sell(size=self.p.trade_size)
 
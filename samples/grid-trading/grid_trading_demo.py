@@ -261,6 +261,10 @@ class GridTradingStrategy(bt.Strategy):
 
     def stop(self):
         """策略结束"""
+        # 关闭日志时不构建统计字符串（参数优化时会有大量策略实例）
+        if not self.p.printlog:
+            return
+
         self.log("=== 策略结束统计 ===")
         self.log(f"总交易次数: {self.total_trades}")
         self.log(f"盈利交易: {self.winning_trades}")
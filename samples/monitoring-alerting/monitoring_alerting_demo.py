@@ -34,6 +34,10 @@ class MonitoredTradingStrategy(bt.Strategy):
         ("printlog", True),
     )
 
+    # 订单状态位掩码：notify_order 的高频分支只需一次整数运算
+    _IGNORE_MASK = (1 << bt.Order.Submitted) | (1 << bt.Order.Accepted)
+    _DONE_MASK = 1 << bt.Order.Completed
+
     def __init__(self):
         # 技术指标
         self.sma = bt.indicators.SMA(self.data, period=self.p.sma_period)
@@ -49,42 +53,41 @@ class MonitoredTradingStrategy(bt.Strategy):
             print("🎯 被监控的交易策略初始化完成")
             print(f"📊 参数: SMA周期={self.p.sma_period}")
 
-    def log(self, txt, dt=None):
-        """日志函数"""
+    def log(self, txt, *args, dt=None):
+        """日志函数，args 仅在 printlog 开启时才格式化进 txt"""
         if self.p.printlog:
+            if args:
+                txt = txt % args
             dt = dt or self.datas[0].datetime.datetime(0)
             print("%s, %s" % (dt.isoformat(), txt))
 
     def notify_order(self, order):
         """订单状态通知"""
-        if order.status in [order.Submitted, order.Accepted]:
+        status_bit = 1 << order.status
+        if status_bit & self._IGNORE_MASK:
             return
 
-        if order.status in [order.Completed]:
+        if status_bit & self._DONE_MASK:
             if order.isbuy():
                 self.log(
-                    "BUY EXECUTED, Price: %.2f, Size: %.6f, Cost: %.2f, Comm %.2f"
-                    % (
-                        order.executed.price,
-                        order.executed.size,
-                        order.executed.value,
-                        order.executed.comm,
-                    )
+                    "BUY EXECUTED, Price: %.2f, Size: %.6f, Cost: %.2f, Comm %.2f",
+                    order.executed.price,
+                    order.executed.size,
+                    order.executed.value,
+                    order.executed.comm,
                 )
                 self.entry_price = order.executed.price
             else:
                 self.log(
-                    "SELL EXECUTED, Price: %.2f, Size: %.6f, Cost: %.2f, Comm %.2f"
-                    % (
-                        order.executed.price,
-                        order.executed.size,
-                        order.executed.value,
-                        order.executed.comm,
-                    )
+                    "SELL EXECUTED, Price: %.2f, Size: %.6f, Cost: %.2f, Comm %.2f",
+                    order.executed.price,
+                    order.executed.size,
+                    order.executed.value,
+                    order.executed.comm,
                 )
                 self.entry_price = None
 
-        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
+        elif order.status in (order.Canceled, order.Margin, order.Rejected):
             self.log("Order Canceled/Margin/Rejected")
 
         self.order = None
@@ -94,7 +97,7 @@ class MonitoredTradingStrategy(bt.Strategy):
         if not trade.isclosed:
             return
 
-        self.log("OPERATION PROFIT, GROSS %.2f, NET %.2f" % (trade.pnl, trade.pnlcomm))
+        self.log("OPERATION PROFIT, GROSS %.2f, NET %.2f", trade.pnl, trade.pnlcomm)
 
     def next(self):
         """每个周期执行"""
@@ -102,28 +105,29 @@ class MonitoredTradingStrategy(bt.Strategy):
         if not self.position:
             # SMA向上交叉时买入
             if self.data.close[0] > self.sma[0] and self.data.close[-1] <= self.sma[-1]:
-                self.log("BUY CREATE, %.2f" % self.data.close[0])
+                self.log("BUY CREATE, %.2f", self.data.close[0])
                 self.order = self.buy(size=0.001)
 
         else:
             # 简单的止损逻辑
             current_price = self.data.close[0]
             if self.entry_price and current_price < self.entry_price * 0.95:
-                self.log("STOP LOSS, %.2f" % current_price)
+                self.log("STOP LOSS, %.2f", current_price)
                 self.order = self.sell(size=self.position.size)
 
             # SMA向下交叉时卖出
             elif (
                 self.data.close[0] < self.sma[0] and self.data.close[-1] >= self.sma[-1]
             ):
-                self.log("SELL CREATE, %.2f" % self.data.close[0])
+                self.log("SELL CREATE, %.2f", self.data.close[0])
                 self.order = self.sell(size=self.position.size)
 
     def stop(self):
         """策略结束"""
         self.log(
-            "(SMA Period %2d) Ending Value %.2f"
-            % (self.params.sma_period, self.broker.getvalue())
+            "(SMA Period %2d) Ending Value %.2f",
+            self.params.sma_period,
+            self.broker.getvalue(),
         )
 
 
@@ -134,7 +138,9 @@ def demonstrate_system_monitoring():
     print("=" * 60)
 
     # 创建监控服务
-    monitor_service = bt.monitoring.create_monitoring_service(check_interval=5.0)
+    monitor_service = bt.monitoring.create_monitoring_service(
+        check_interval=5.0, target_samples=1
+    )
 
     # 添加系统资源告警规则
     cpu_alert = bt.monitoring.SystemResourceAlertRule("cpu_percent", 70, ">")
@@ -148,7 +154,8 @@ def demonstrate_system_monitoring():
 
     try:
         print("开始监控系统资源...")
-        time.sleep(10)  # 监控10秒钟
+        # 采集到足够样本即继续，最多等待10秒钟
+        monitor_service.sample_event.wait(timeout=10)
 
         # 查看监控数据
         system_metrics = monitor_service.get_system_metrics()
@@ -356,10 +363,9 @@ def demonstrate_custom_alert_rules():
     # 模拟投资组合价值变化
     portfolio_values = [10000, 10500, 10800, 10200, 9800, 9300]  # 逐步下跌
 
-    for i, value in enumerate(portfolio_values):
-        context = {"portfolio_value": value}
-        alert_manager.check_alerts(context)
-        time.sleep(0.1)  # 小间隔
+    alert_manager.check_alerts_batch(
+        [{"portfolio_value": value} for value in portfolio_values]
+    )
 
     # 显示结果
     active_alerts = alert_manager.get_active_alerts()
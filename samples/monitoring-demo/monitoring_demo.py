@@ -9,6 +9,7 @@ Monitoring Demo for Backtrader
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import datetime
+import sys
 
 import backtrader as bt
 
@@ -37,42 +38,45 @@ class MonitoringDemoStrategy(bt.Strategy):
         self.order = None
         self.bar_executed = None
 
-    def log(self, txt, dt=None, doprint=False):
-        """日志函数"""
-        if self.params.printlog or doprint:
-            dt = dt or self.datas[0].datetime.datetime(0)
-            print("%s, %s" % (dt.isoformat(), txt))
+        # 日志缓冲: 运行期间只追加，stop() 时一次性写出
+        self._log_buffer = []
+
+    def log(self, txt, *args, dt=None, doprint=False):
+        """日志函数，args 仅在需要输出时才通过 % 填入 txt，输出缓冲到 stop()"""
+        if not (self.params.printlog or doprint):
+            return
+
+        if args:
+            txt = txt % args
+        dt = dt or self.datas[0].datetime.datetime(0)
+        self._log_buffer.append("%s, %s" % (dt.isoformat(), txt))
 
     def notify_order(self, order):
         """订单状态通知"""
-        if order.status in [order.Submitted, order.Accepted]:
+        if order.status in (order.Submitted, order.Accepted):
             return
 
-        if order.status in [order.Completed]:
+        if order.status in (order.Completed,):
             if order.isbuy():
                 self.log(
-                    "BUY EXECUTED, Price: %.2f, Size: %.2f, Cost: %.2f, Comm %.2f"
-                    % (
-                        order.executed.price,
-                        order.executed.size,
-                        order.executed.value,
-                        order.executed.comm,
-                    )
+                    "BUY EXECUTED, Price: %.2f, Size: %.2f, Cost: %.2f, Comm %.2f",
+                    order.executed.price,
+                    order.executed.size,
+                    order.executed.value,
+                    order.executed.comm,
                 )
             else:
                 self.log(
-                    "SELL EXECUTED, Price: %.2f, Size: %.2f, Cost: %.2f, Comm %.2f"
-                    % (
-                        order.executed.price,
-                        order.executed.size,
-                        order.executed.value,
-                        order.executed.comm,
-                    )
+                    "SELL EXECUTED, Price: %.2f, Size: %.2f, Cost: %.2f, Comm %.2f",
+                    order.executed.price,
+                    order.executed.size,
+                    order.executed.value,
+                    order.executed.comm,
                 )
 
             self.bar_executed = len(self)
 
-        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
+        elif order.status in (order.Canceled, order.Margin, order.Rejected):
             self.log("Order Canceled/Margin/Rejected")
 
         self.order = None
@@ -82,12 +86,12 @@ class MonitoringDemoStrategy(bt.Strategy):
         if not trade.isclosed:
             return
 
-        self.log("OPERATION PROFIT, GROSS %.2f, NET %.2f" % (trade.pnl, trade.pnlcomm))
+        self.log("OPERATION PROFIT, GROSS %.2f, NET %.2f", trade.pnl, trade.pnlcomm)
 
     def next(self):
         """每个周期调用"""
         # 记录收盘价
-        self.log("Close, %.2f" % self.data_close[0])
+        self.log("Close, %.2f", self.data_close[0])
 
         # 检查是否有挂起的订单
         if self.order:
@@ -98,24 +102,30 @@ class MonitoringDemoStrategy(bt.Strategy):
             # SMA向上交叉时买入
             if self.data_close[0] > self.sma[0]:
                 if self.data_close[-1] <= self.sma[-1]:  # 交叉确认
-                    self.log("BUY CREATE, %.2f" % self.data_close[0])
+                    self.log("BUY CREATE, %.2f", self.data_close[0])
                     self.order = self.buy()
 
         else:
             # 持仓时，SMA向下交叉时卖出
             if self.data_close[0] < self.sma[0]:
                 if self.data_close[-1] >= self.sma[-1]:  # 交叉确认
-                    self.log("SELL CREATE, %.2f" % self.data_close[0])
+                    self.log("SELL CREATE, %.2f", self.data_close[0])
                     self.order = self.sell()
 
     def stop(self):
         """策略结束时调用"""
         self.log(
-            "(SMA Period %2d) Ending Value %.2f"
-            % (self.params.sma_period, self.broker.getvalue()),
+            "(SMA Period %2d) Ending Value %.2f",
+            self.params.sma_period,
+            self.broker.getvalue(),
             doprint=True,
         )
 
+        if self._log_buffer:
+            self._log_buffer.append("")
+            sys.stdout.write("\n".join(self._log_buffer))
+            self._log_buffer = []
+
 
 def run_monitoring_demo():
     """运行监控演示"""
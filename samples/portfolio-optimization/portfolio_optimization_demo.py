@@ -8,9 +8,16 @@ Portfolio Optimization Demo for Backtrader
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-import datetime
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
 
 import backtrader as bt
+from data_downloader.providers.yahoo import load_yahoo_dataframe
 
 
 class MultiAssetStrategy(bt.Strategy):
@@ -40,9 +47,11 @@ class MultiAssetStrategy(bt.Strategy):
         self.days_since_rebalance = 0
         self.last_optimization_result = None
 
-    def log(self, txt, dt=None):
-        """日志记录"""
+    def log(self, txt, *args, dt=None):
+        """日志记录，args 仅在 printlog 开启时才通过 str.format 填入 txt"""
         if self.p.printlog:
+            if args:
+                txt = txt.format(*args)
             dt = dt or self.datas[0].datetime.date(0)
             print("%s, %s" % (dt.isoformat(), txt))
 
@@ -74,15 +83,16 @@ class MultiAssetStrategy(bt.Strategy):
             self.last_optimization_result = optimization_result
 
             self.log(
-                f"优化完成 - 预期收益: {optimization_result.expected_return:.2%}, "
-                f"风险: {optimization_result.risk:.2%}, "
-                f"夏普比率: {optimization_result.sharpe_ratio:.2f}"
+                "优化完成 - 预期收益: {:.2%}, 风险: {:.2%}, 夏普比率: {:.2f}",
+                optimization_result.expected_return,
+                optimization_result.risk,
+                optimization_result.sharpe_ratio,
             )
 
             # 显示权重分配
             self.log("最优权重分配:")
             for asset, weight in optimization_result.weights.items():
-                self.log(f"  {asset}: {weight:.2%}")
+                self.log("  {}: {:.2%}", asset, weight)
 
             # 设置目标权重并执行再平衡
             self.rebalancer.set_target_weights(optimization_result.weights)
@@ -93,43 +103,36 @@ class MultiAssetStrategy(bt.Strategy):
                 data = self.getdatabyname(data_name)
                 if size_diff > 0:
                     self.buy(data=data, size=size_diff)
-                    self.log(f"买入 {data_name}: {size_diff} 股，价格 {price:.2f}")
+                    self.log("买入 {}: {} 股，价格 {:.2f}", data_name, size_diff, price)
                 elif size_diff < 0:
                     self.sell(data=data, size=abs(size_diff))
-                    self.log(f"卖出 {data_name}: {abs(size_diff)} 股，价格 {price:.2f}")
+                    self.log(
+                        "卖出 {}: {} 股，价格 {:.2f}", data_name, abs(size_diff), price
+                    )
 
         except Exception as e:
-            self.log(f"优化过程出错: {e}")
+            self.log("优化过程出错: {}", e)
 
     def stop(self):
         """策略结束"""
-        if self.last_optimization_result:
+        result = self.last_optimization_result
+        if result:
             self.log("=== 最终投资组合统计 ===")
-            self.log(
-                f"预期年化收益: {self.last_optimization_result.expected_return:.2%}"
-            )
-            self.log(f"年化波动率: {self.last_optimization_result.risk:.2%}")
-            self.log(f"夏普比率: {self.last_optimization_result.sharpe_ratio:.2f}")
-
-            total_value = self.broker.getvalue()
-            self.log(f"最终组合价值: {total_value:.2f}")
+            self.log("预期年化收益: {:.2%}", result.expected_return)
+            self.log("年化波动率: {:.2%}", result.risk)
+            self.log("夏普比率: {:.2f}", result.sharpe_ratio)
+            self.log("最终组合价值: {:.2f}", self.broker.getvalue())
 
 
 def load_sample_data():
     """加载示例数据"""
-    # 使用内置的ORCL数据作为示例
-    data1 = bt.feeds.YahooFinanceData(
-        dataname="ORCL",
-        fromdate=datetime.datetime(2000, 1, 1),
-        todate=datetime.datetime(2000, 12, 31),
-    )
+    # 使用ORCL数据作为示例，两个演示共享同一份下载结果，本地缓存供重复运行复用
+    df = load_yahoo_dataframe("ORCL", "2000-01-01", "2000-12-31", use_cache=True)
+
+    data1 = bt.feeds.PandasData(dataname=df.copy())
     data1._name = "ORCL"
 
-    data2 = bt.feeds.YahooFinanceData(
-        dataname="ORCL",
-        fromdate=datetime.datetime(2000, 1, 1),
-        todate=datetime.datetime(2000, 12, 31),
-    )
+    data2 = bt.feeds.PandasData(dataname=df.copy())
     data2._name = "ORCL_COPY"  # 模拟第二个资产
 
     return [data1, data2]
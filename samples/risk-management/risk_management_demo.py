@@ -14,6 +14,7 @@ Demonstration of Enterprise Risk Management System
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import datetime
+import math
 import os
 import sys
 
@@ -27,6 +28,8 @@ import backtrader as bt
 # 添加项目路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from data_downloader.providers.yahoo import load_yahoo_dataframe
+
 
 class RiskManagedStrategy(bt.Strategy):
     """
@@ -39,8 +42,9 @@ class RiskManagedStrategy(bt.Strategy):
     )
 
     def __init__(self):
-        # 技术指标
-        self.sma = bt.indicators.SMA(self.data, period=self.p.sma_period)
+        # 技术指标: SMA 以滚动和在 next() 中增量维护，每根K线 O(1)
+        self._sma_sum = None
+        self._sma_prev = float("nan")
 
         # 订单和持仓管理
         self.order = None
@@ -49,46 +53,67 @@ class RiskManagedStrategy(bt.Strategy):
         # 风控相关
         self.risk_monitor = None
 
+        # 日志缓冲: 运行期间只追加，stop() 时一次性写出
+        self._log_buf = []
+        self._log_bar = -1
+        self._bar_iso = ""
+
         if self.p.printlog:
             print("🎯 风控管理策略初始化完成")
             print(f"📊 参数: SMA周期={self.p.sma_period}")
 
-    def log(self, txt, dt=None):
-        """日志函数"""
-        if self.p.printlog:
-            dt = dt or self.datas[0].datetime.datetime(0)
-            print("%s, %s" % (dt.isoformat(), txt))
+    def log(self, txt, *args, dt=None):
+        """日志函数，args 仅在 printlog 开启时才通过 % 填入 txt，输出缓冲到 stop()"""
+        if not self.p.printlog:
+            return
+
+        if args:
+            txt = txt % args
+
+        if dt is not None:
+            stamp = dt.isoformat()
+        else:
+            # 同一根K线内的多条日志共享一次 datetime 转换
+            if self._log_bar != len(self):
+                self._log_bar = len(self)
+                self._bar_iso = self.datas[0].datetime.datetime(0).isoformat()
+            stamp = self._bar_iso
+
+        self._log_buf.append("%s, %s" % (stamp, txt))
+
+    def _flush_log(self):
+        """写出缓冲的日志"""
+        if self._log_buf:
+            self._log_buf.append("")
+            sys.stdout.write("\n".join(self._log_buf))
+            self._log_buf = []
 
     def notify_order(self, order):
         """订单状态通知"""
-        if order.status in [order.Submitted, order.Accepted]:
+        if order.status in (order.Submitted, order.Accepted):
             return
 
-        if order.status in [order.Completed]:
+        if order.status in (order.Completed,):
             if order.isbuy():
                 self.log(
-                    "BUY EXECUTED, Price: %.2f, Size: %.6f, Cost: %.2f, Comm %.2f"
-                    % (
-                        order.executed.price,
-                        order.executed.size,
-                        order.executed.value,
-                        order.executed.comm,
-                    )
+                    "BUY EXECUTED, Price: %.2f, Size: %.6f, Cost: %.2f, Comm %.2f",
+                    order.executed.price,
+                    order.executed.size,
+                    order.executed.value,
+                    order.executed.comm,
                 )
                 self.entry_price = order.executed.price
             else:
                 self.log(
-                    "SELL EXECUTED, Price: %.2f, Size: %.6f, Cost: %.2f, Comm %.2f"
-                    % (
-                        order.executed.price,
-                        order.executed.size,
-                        order.executed.value,
-                        order.executed.comm,
-                    )
+                    "SELL EXECUTED, Price: %.2f, Size: %.6f, Cost: %.2f, Comm %.2f",
+                    order.executed.price,
+                    order.executed.size,
+                    order.executed.value,
+                    order.executed.comm,
                 )
                 self.entry_price = None
 
-        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
+        elif order.status in (order.Canceled, order.Margin, order.Rejected):
             self.log("Order Canceled/Margin/Rejected")
 
         self.order = None
@@ -98,15 +123,35 @@ class RiskManagedStrategy(bt.Strategy):
         if not trade.isclosed:
             return
 
-        self.log("OPERATION PROFIT, GROSS %.2f, NET %.2f" % (trade.pnl, trade.pnlcomm))
+        self.log("OPERATION PROFIT, GROSS %.2f, NET %.2f", trade.pnl, trade.pnlcomm)
+
+    def _update_sma(self):
+        """增量更新SMA，返回 (当前值, 前一值)；预热期内返回 None"""
+        period = self.p.sma_period
+        if len(self) < period:
+            return None
+
+        close = self.data.close
+        if self._sma_sum is None:
+            self._sma_sum = math.fsum(close.get(size=period))
+        else:
+            self._sma_sum += close[0] - close[-period]
+
+        sma_prev, self._sma_prev = self._sma_prev, self._sma_sum / period
+        return self._sma_prev, sma_prev
 
     def next(self):
         """每个周期执行"""
+        sma = self._update_sma()
+        if sma is None:
+            return
+        sma_now, sma_prev = sma
+
         # 基本交易逻辑
         if not self.position:
             # SMA向上交叉时买入
-            if self.data.close[0] > self.sma[0] and self.data.close[-1] <= self.sma[-1]:
-                self.log("BUY CREATE, %.2f" % self.data.close[0])
+            if self.data.close[0] > sma_now and self.data.close[-1] <= sma_prev:
+                self.log("BUY CREATE, %.2f", self.data.close[0])
                 self.order = self.buy(size=0.001)  # 固定小仓位测试风控
 
         else:
@@ -115,22 +160,42 @@ class RiskManagedStrategy(bt.Strategy):
 
             # 简单的止损逻辑
             if self.entry_price and current_price < self.entry_price * 0.95:  # 5%止损
-                self.log("STOP LOSS, %.2f" % current_price)
+                self.log("STOP LOSS, %.2f", current_price)
                 self.order = self.sell(size=self.position.size)
 
             # SMA向下交叉时卖出
-            elif (
-                self.data.close[0] < self.sma[0] and self.data.close[-1] >= self.sma[-1]
-            ):
-                self.log("SELL CREATE, %.2f" % self.data.close[0])
+            elif self.data.close[0] < sma_now and self.data.close[-1] >= sma_prev:
+                self.log("SELL CREATE, %.2f", self.data.close[0])
                 self.order = self.sell(size=self.position.size)
 
     def stop(self):
         """策略结束"""
         self.log(
-            "(SMA Period %2d) Ending Value %.2f"
-            % (self.params.sma_period, self.broker.getvalue())
+            "(SMA Period %2d) Ending Value %.2f",
+            self.params.sma_period,
+            self.broker.getvalue(),
         )
+        self._flush_log()
+
+
+class MonitoredStrategy(RiskManagedStrategy, bt.risk.RiskControlMixin):
+    """
+    带风控混入的策略，风险监控器通过 risk_monitor 参数注入
+    """
+
+    params = (("risk_monitor", None),)
+
+    def __init__(self):
+        RiskManagedStrategy.__init__(self)
+        bt.risk.RiskControlMixin.__init__(self)
+        self.set_risk_monitor(self.p.risk_monitor)
+
+
+def _make_feed(symbol, fromdate, todate):
+    """基于缓存的 DataFrame 构建新的数据源（每个 Cerebro 需独立的 feed）"""
+    # 演示数据缓存到本地，重复运行不再访问网络
+    df = load_yahoo_dataframe(symbol, fromdate, todate, use_cache=True)
+    return bt.feeds.PandasData(dataname=df.copy())
 
 
 def demonstrate_pre_trade_risk():
@@ -153,11 +218,7 @@ def demonstrate_pre_trade_risk():
     )
 
     # 添加数据
-    data = bt.feeds.YahooFinanceData(
-        dataname="AAPL",
-        fromdate=datetime.datetime(2020, 1, 1),
-        todate=datetime.datetime(2020, 12, 31),
-    )
+    data = _make_feed("AAPL", "2020-01-01", "2020-12-31")
     cerebro.adddata(data)
 
     # 添加策略
@@ -207,21 +268,11 @@ def demonstrate_real_time_monitoring():
     )
 
     # 添加数据
-    data = bt.feeds.YahooFinanceData(
-        dataname="GOOGL",
-        fromdate=datetime.datetime(2020, 1, 1),
-        todate=datetime.datetime(2020, 12, 31),
-    )
+    data = _make_feed("GOOGL", "2020-01-01", "2020-12-31")
     cerebro.adddata(data)
 
     # 添加策略（带风控混入）
-    class MonitoredStrategy(RiskManagedStrategy, bt.risk.RiskControlMixin):
-        def __init__(self):
-            RiskManagedStrategy.__init__(self)
-            bt.risk.RiskControlMixin.__init__(self)
-            self.set_risk_monitor(risk_monitor)
-
-    cerebro.addstrategy(MonitoredStrategy)
+    cerebro.addstrategy(MonitoredStrategy, risk_monitor=risk_monitor)
 
     # 设置初始资金
     cerebro.broker.setcash(10000.0)
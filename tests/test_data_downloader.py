@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+"""
+Tests for the data_downloader providers
+
+Exchange and market data sources are replaced by in-process fakes, so these
+tests do not touch the network.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import os
+import stat
+
+import pytest
+
+import testcommon  # noqa: F401  (puts the repository root on sys.path)
+
+DAY_MS = 86400000
+
+
+async def _daily_ohlcv(symbol, timeframe, since, limit):
+    start = -(-since // DAY_MS) * DAY_MS
+    return [
+        [t, 1.0, 2.0, 0.5, 1.5, 10.0]
+        for t in range(start, start + limit * DAY_MS, DAY_MS)
+    ]
+
+
+def _ccxt_downloader(fromdate, todate, limit, fetch_ohlcv=_daily_ohlcv):
+    """CCXTDownloader whose exchanges serve candles from memory"""
+    pytest.importorskip("ccxt")
+    from data_downloader.providers.ccxt import CCXTDownloader
+
+    downloader = CCXTDownloader("binance", "BTC/USDT", fromdate, todate)
+    downloader.limit = limit
+    downloader.exchanges = []
+
+    async def fetch_markets(params={}):
+        return [{"id": "BTCUSDT", "symbol": "BTC/USDT", "base": "BTC",
+                 "quote": "USDT", "spot": True}]
+
+    async def fetch_currencies(params={}):
+        return {}
+
+    create_exchange = downloader._create_exchange
+
+    def fake_exchange():
+        exchange = create_exchange()
+        exchange.fetch_ohlcv = fetch_ohlcv
+        exchange.fetch_markets = fetch_markets
+        exchange.fetch_currencies = fetch_currencies
+        downloader.exchanges.append(exchange)
+        return exchange
+
+    downloader._create_exchange = fake_exchange
+    return downloader
+
+
+def test_ccxt_includes_todate_on_window_boundary():
+    # 9 days between the dates is an exact multiple of limit * 1d
+    downloader = _ccxt_downloader("2020-01-01", "2020-01-10", limit=3)
+    out = io.StringIO()
+
+    assert downloader.download(out), downloader.error
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 1 + 10
+    assert lines[1].startswith("2020-01-01 00:00:00,")
+    assert lines[-1].startswith("2020-01-10 00:00:00,")
+
+
+def test_ccxt_download_to_path(tmp_path):
+    downloader = _ccxt_downloader("2020-01-01", "2020-01-05", limit=3)
+    target = tmp_path / "btc.csv"
+
+    assert downloader.download(str(target)), downloader.error
+    assert downloader.is_successful()
+    assert downloader.get_data_as_string() == target.read_text(encoding="utf-8")
+    assert len(target.read_text(encoding="utf-8").splitlines()) == 1 + 5
+    assert [p.name for p in tmp_path.iterdir()] == ["btc.csv"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_ccxt_download_file_permissions(tmp_path):
+    downloader = _ccxt_downloader("2020-01-01", "2020-01-05", limit=3)
+    umask = os.umask(0o027)
+    try:
+        created = tmp_path / "new.csv"
+        assert downloader.download(str(created)), downloader.error
+
+        existing = tmp_path / "old.csv"
+        existing.write_text("previous data\n", encoding="utf-8")
+        existing.chmod(0o604)
+        assert downloader.download(str(existing)), downloader.error
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(created.stat().st_mode) == 0o640
+    assert stat.S_IMODE(existing.stat().st_mode) == 0o604
+
+
+def test_ccxt_download_inside_running_event_loop():
+    import asyncio
+
+    downloader = _ccxt_downloader("2020-01-01", "2020-01-05", limit=3)
+
+    async def caller():
+        outs = [io.StringIO(), io.StringIO()]
+        return [downloader.download(out) for out in outs], outs
+
+    results, outs = asyncio.run(caller())
+    assert results == [True, True], downloader.error
+    assert outs[0].getvalue() == outs[1].getvalue()
+    assert len(outs[0].getvalue().splitlines()) == 1 + 5
+    # Each download gets its own client, closed once it is done
+    assert len(downloader.exchanges) == 2
+    assert downloader.exchanges[0] is not downloader.exchanges[1]
+
+
+def test_ccxt_failed_download_keeps_existing_file(tmp_path):
+    async def fetch_ohlcv(symbol, timeframe, since, limit):
+        raise IOError("network down")
+
+    downloader = _ccxt_downloader("2020-01-01", "2020-01-05", limit=3,
+                                  fetch_ohlcv=fetch_ohlcv)
+    target = tmp_path / "btc.csv"
+    target.write_text("previous data\n", encoding="utf-8")
+
+    assert not downloader.download(str(target))
+    assert not downloader.is_successful()
+    assert target.read_text(encoding="utf-8") == "previous data\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["btc.csv"]
+
+
+def test_dataframe_output_is_identical_for_path_and_file_object(tmp_path):
+    pd = pytest.importorskip("pandas")
+    from data_downloader.core.downloader import BaseDownloader
+
+    class FrameDownloader(BaseDownloader):
+        def download(self, output_file):
+            self._write_output(output_file)
+            return True
+
+    downloader = FrameDownloader()
+    downloader.df = pd.DataFrame({
+        "Date": ["2020-01-01", "2020-01-02"],
+        "Open": [1.0, 2.5],
+        "Volume": [100, 200],
+        "Name": ["a,b", "c"],
+    })
+    target = tmp_path / "frame.csv"
+    out = io.StringIO()
+
+    downloader.download(str(target))
+    downloader.download(out)
+    assert target.read_text(encoding="utf-8") == out.getvalue()
+    assert out.getvalue() == downloader.df.to_csv(index=False)
+
+
+def test_date_validation_accepts_only_year_month_day():
+    from data_downloader.utils.helpers import validate_date_range
+
+    assert validate_date_range("2020-1-5", "2020-01-06")
+    assert not validate_date_range("20200101", "2020-01-06")
+    assert not validate_date_range("2020-W01-1", "2020-01-06")
+    assert not validate_date_range("2020-01-07", "2020-01-06")
+
+    from data_downloader.core.downloader import BaseDownloader
+
+    validate = BaseDownloader._validate_dates
+    assert validate(None, "2020-1-5", "2020-01-06")[0].day == 5
+    for bad in ("20200101", "2020-W01-1"):
+        with pytest.raises(ValueError):
+            validate(None, bad, "2020-01-06")
+
+
+def test_load_yahoo_dataframe_fetches_once(tmp_path, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    import types
+
+    from data_downloader.providers import yahoo
+
+    calls = []
+
+    class Ticker(object):
+        def __init__(self, ticker):
+            self.ticker = ticker
+
+        def history(self, start, end, interval):
+            calls.append((self.ticker, start, end, interval))
+            index = pd.date_range(start, periods=3, freq="D", tz="America/New_York",
+                                  name="Date")
+            return pd.DataFrame({"Open": [1.0, 2.0, 3.0], "Close": [1.5, 2.5, 3.5],
+                                 "Volume": [10, 20, 30]}, index=index)
+
+    monkeypatch.setitem(__import__("sys").modules, "yfinance",
+                        types.SimpleNamespace(Ticker=Ticker))
+    monkeypatch.setattr(yahoo, "CACHE_DIR", str(tmp_path))
+    yahoo.load_yahoo_dataframe.cache_clear()
+
+    df = yahoo.load_yahoo_dataframe("ORCL", "2000-01-03", "2000-01-06")
+    again = yahoo.load_yahoo_dataframe("ORCL", "2000-01-03", "2000-01-06")
+    yahoo.load_yahoo_dataframe.cache_clear()
+
+    assert again is df
+    assert len(calls) == 1
+    assert df.index.tz is None
+    assert list(df["Close"]) == [1.5, 2.5, 3.5]
+    # Adjusted prices go stale, so nothing is persisted unless asked for
+    assert list(tmp_path.iterdir()) == []
+    assert not yahoo.YahooDownloader("ORCL", "2000-01-03", "2000-01-06").use_cache
+
+
+def test_batch_akshare_keeps_spec_order_and_checks_specs(monkeypatch):
+    pd = pytest.importorskip("pandas")
+    import types
+
+    from data_downloader.providers.akshare import batch_download_akshare_data
+
+    calls = []
+
+    def stock_zh_a_hist(symbol, period, start_date, end_date, adjust):
+        calls.append((symbol, adjust))
+        close = {"qfq": 1.0, "hfq": 2.0}[adjust]
+        return pd.DataFrame({"日期": ["2020-01-02"], "开盘": [close],
+                             "收盘": [close], "最高": [close], "最低": [close],
+                             "成交量": [100]})
+
+    monkeypatch.setitem(__import__("sys").modules, "akshare",
+                        types.SimpleNamespace(stock_zh_a_hist=stock_zh_a_hist))
+
+    common = dict(symbol="000001", fromdate="2020-01-01", todate="2020-01-31",
+                  use_cache=False)
+    with pytest.raises(ValueError):
+        batch_download_akshare_data([common, {"fromdate": "2020-01-01"}])
+    assert calls == []
+
+    frames = batch_download_akshare_data([dict(common, adjust="hfq"),
+                                          dict(common, adjust="qfq")])
+    assert [df["Close"].iloc[0] for df in frames] == [2.0, 1.0]
+
+
+def test_akshare_caches_only_unadjusted_data(tmp_path, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    import types
+
+    from data_downloader.providers import akshare
+
+    def stock_zh_a_hist(symbol, period, start_date, end_date, adjust):
+        return pd.DataFrame({"日期": ["2020-01-02"], "开盘": [1.0], "收盘": [1.0],
+                             "最高": [1.0], "最低": [1.0], "成交量": [100]})
+
+    monkeypatch.setitem(__import__("sys").modules, "akshare",
+                        types.SimpleNamespace(stock_zh_a_hist=stock_zh_a_hist))
+    monkeypatch.setattr(akshare, "CACHE_DIR", str(tmp_path))
+    common = dict(symbol="000001", fromdate="2020-01-01", todate="2020-01-31")
+
+    assert not akshare.AkShareDownloader(**common).use_cache
+    assert akshare.AkShareDownloader(**common).fetch()
+    assert akshare.AkShareDownloader(adjust="qfq", use_cache=True, **common).fetch()
+    assert list(tmp_path.iterdir()) == []
+
+    pytest.importorskip("pyarrow")
+    assert akshare.AkShareDownloader(adjust="", use_cache=True, **common).fetch()
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_akshare_foreign_futures_keeps_number_format(monkeypatch):
+    pd = pytest.importorskip("pandas")
+    import types
+
+    from data_downloader.providers import akshare
+
+    def futures_foreign_hist(symbol):
+        return pd.DataFrame({"date": ["2019-12-31", "2020-01-02", "2020-01-03"],
+                             "open": [1.0, 2.0, 3.0], "high": [1.5, 2.5, 3.5],
+                             "low": [1.0, 2.0, 3.0], "close": [1.0, 2.0, 3.0],
+                             "volume": [100, 200, 300]})
+
+    monkeypatch.setitem(__import__("sys").modules, "akshare",
+                        types.SimpleNamespace(futures_foreign_hist=futures_foreign_hist))
+
+    downloader = akshare.AkShareDownloader("CL", "2020-01-01", "2020-01-31",
+                                           market="foreign_futures")
+    out = io.StringIO()
+    assert downloader.download(out), downloader.error
+    assert out.getvalue().splitlines() == [
+        "Date,Open,High,Low,Close,Volume,OpenInterest",
+        "2020-01-02,2.0,2.5,2.0,2.0,200,0",
+        "2020-01-03,3.0,3.5,3.0,3.0,300,0",
+    ]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+"""
+RealTimeRiskMonitor tail risk: CVaR must match the percentile-and-mask
+computation it replaced, and VaR/CVaR computed from the reduced-precision
+return history (_RETURNS_DTYPE, float32) must stay within 1e-5 of float64.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import numpy as np
+
+import testcommon  # noqa: F401  (puts the repository root on sys.path)
+
+from backtrader.risk.real_time_monitor import (RealTimeRiskMonitor,
+                                               _RingBuffer, _RETURNS_DTYPE)
+
+
+def _tail_risk_errors(returns, confidence_level):
+    size = len(returns)
+    buf32 = _RingBuffer(size, _RETURNS_DTYPE)
+    buf64 = _RingBuffer(size, np.float64)
+    for r in returns:
+        buf32.append(r)
+        buf64.append(r)
+
+    var32, cvar32 = RealTimeRiskMonitor._tail_risk(buf32.values(), confidence_level)
+    var64, cvar64 = RealTimeRiskMonitor._tail_risk(buf64.values(), confidence_level)
+    return abs(var32 - var64), abs(cvar32 - cvar64)
+
+
+def _percentile_mask_cvar(returns, confidence_level):
+    """CVaR as originally computed: mean of returns at or below the percentile"""
+    threshold = np.percentile(returns, (1 - confidence_level) * 100)
+    return abs(np.mean(returns[returns <= threshold]))
+
+
+def test_cvar_matches_percentile_mask(main=False):
+    rng = np.random.default_rng(20240102)
+    for size in range(30, 253):
+        returns = rng.standard_t(3, size=size) * 0.01
+        # Rounded returns exercise ties at the threshold
+        for data in (returns, np.round(returns, 3)):
+            for confidence_level in (0.95, 0.99):
+                _, cvar = RealTimeRiskMonitor._tail_risk(data, confidence_level)
+                expected = _percentile_mask_cvar(data, confidence_level)
+                assert abs(cvar - expected) < 1e-12, (size, confidence_level)
+
+
+def test_run(main=False):
+    # Fat-tailed daily returns (Student t, 3 dof, ~1% scale), one year each
+    rng = np.random.default_rng(20240101)
+    samples = rng.standard_t(3, size=(500, 252)) * 0.01
+
+    errors = [
+        err
+        for returns in samples
+        for confidence_level in (0.95, 0.99)
+        for err in _tail_risk_errors(returns, confidence_level)
+    ]
+    max_error = max(errors)
+    if main:
+        print("max abs VaR/CVaR error float32 vs float64: %.3g" % max_error)
+
+    assert max_error < 1e-5
+
+
+if __name__ == '__main__':
+    test_run(main=True)
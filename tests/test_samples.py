@@ -22,100 +22,164 @@ Usage:
 
     # 指定 samples 目录
     python test_samples.py --samples-dir /path/to/samples
+
+    # 并行运行的示例数（默认 CPU 核数）
+    python test_samples.py --jobs 4
 """
 
 import argparse
+import asyncio
+import fnmatch
 import os
-import subprocess
+import re
 import sys
 import time
+from collections import deque
 from pathlib import Path
 
 
 class SampleTester:
+    # Only the last chunks of each child stream are kept in memory
+    max_output_chunks = 50
+    read_chunk_size = 4096
+
     def __init__(
-        self, samples_dir="samples", python_exe=None, timeout=30, verbose=False
+        self,
+        samples_dir="samples",
+        python_exe=None,
+        timeout=30,
+        verbose=False,
+        jobs=None,
     ):
         self.samples_dir = Path(samples_dir)
         self.python_exe = python_exe or sys.executable
         self.timeout = timeout
         self.verbose = verbose
+        self.jobs = jobs or os.cpu_count() or 1
         self.results = {"passed": [], "failed": [], "skipped": [], "timeout": []}
+        # Child environment is built once and shared by every sample run;
+        # MPLBACKEND=Agg disables matplotlib display
+        self._child_env = {**os.environ, "MPLBACKEND": "Agg"}
 
     def find_samples(self):
         """Find all Python sample files"""
-        samples = []
-        for py_file in self.samples_dir.rglob("*.py"):
-            # Skip __init__.py and other utility files
-            if py_file.name.startswith("__"):
-                continue
-            samples.append(py_file)
-        return sorted(samples)
-
-    def run_sample(self, sample_path):
-        """Run a single sample script"""
-        print(f"\n{'=' * 70}")
-        print(f"Testing: {sample_path.relative_to(self.samples_dir.parent)}")
-        print(f"{'=' * 70}")
+        return sorted(Path(path) for path in self._walk(self.samples_dir))
+
+    @classmethod
+    def _walk(cls, dirpath):
+        """Yield sample file paths below dirpath using os.scandir"""
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from cls._walk(entry.path)
+                # Skip __init__.py and other utility files
+                elif entry.name.endswith(".py") and not entry.name.startswith("__"):
+                    yield entry.path
+
+    @staticmethod
+    def find_no_plot_flag(sample_path):
+        """Return the no-plot flag a sample accepts, if any
+
+        The flags are declared literally in each sample's argparse setup, so
+        scanning the source avoids spawning a ``--help`` probe per sample.
+        """
+        source = sample_path.read_text(encoding="utf-8", errors="ignore").lower()
+        # Try different variations of no-plot flags
+        for flag in ("--noplot", "--no-plot"):
+            if flag in source:
+                return flag
+        return None
+
+    def run_sample(self, sample_path, progress=""):
+        """Run a single sample script and return its status"""
+        return asyncio.run(self._run_sample_async(sample_path, progress))
+
+    async def _run_sample_async(self, sample_path, progress=""):
+        """Run a single sample script on the current event loop
+
+        Output is buffered and printed in one block so that samples running
+        concurrently do not interleave their logs.
+        """
+        out = []
+        status = await self._run_sample(sample_path, progress, out)
+        print("\n".join(out), flush=True)
+        return status
+
+    async def _run_sample(self, sample_path, progress, out):
+        out.append(f"\n{progress}{'=' * 70}")
+        out.append(f"Testing: {sample_path.relative_to(self.samples_dir.parent)}")
+        out.append(f"{'=' * 70}")
 
         try:
             # Change to the sample's directory
             cwd = sample_path.parent
 
-            # Set environment variable to disable matplotlib display
-            env = os.environ.copy()
-            env["MPLBACKEND"] = "Agg"  # Use non-interactive backend
-
-            # Run the sample with --help first to check if it's runnable
-            result = subprocess.run(
-                [self.python_exe, sample_path.name, "--help"],
-                cwd=cwd,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                env=env,
-            )
-
             # Build command with various no-plot options
             cmd = [self.python_exe, sample_path.name]
-
-            # Try different variations of no-plot flags
-            help_text = result.stdout.lower() + result.stderr.lower()
-            if "--noplot" in help_text:
-                cmd.append("--noplot")
-            elif "--no-plot" in help_text:
-                cmd.append("--no-plot")
+            no_plot_flag = self.find_no_plot_flag(sample_path)
+            if no_plot_flag:
+                cmd.append(no_plot_flag)
             # Don't add --plot False, just rely on MPLBACKEND=Agg
 
             start_time = time.time()
-            result = subprocess.run(
-                cmd,
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
                 cwd=cwd,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout,
-                env=env,  # Use environment with non-interactive backend
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self._child_env,  # Use environment with non-interactive backend
             )
+            stdout = deque(maxlen=self.max_output_chunks)
+            stderr = deque(maxlen=self.max_output_chunks)
+
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        self._drain(proc.stdout, stdout),
+                        self._drain(proc.stderr, stderr),
+                        proc.wait(),
+                    ),
+                    timeout=self.timeout,
+                )
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
+            returncode = proc.returncode
             elapsed = time.time() - start_time
 
-            if result.returncode == 0:
-                print(f"✅ PASSED ({elapsed:.2f}s)")
-                if self.verbose and result.stdout:
-                    print(f"\nOutput:\n{result.stdout[:500]}")
+            if returncode == 0:
+                out.append(f"✅ PASSED ({elapsed:.2f}s)")
+                if self.verbose and stdout:
+                    out.append(f"\nOutput:\n{self._preview(stdout)}")
                 return "passed"
             else:
-                print(f"❌ FAILED (exit code: {result.returncode})")
-                if result.stderr:
-                    print(f"\nError:\n{result.stderr[:500]}")
+                out.append(f"❌ FAILED (exit code: {returncode})")
+                if stderr:
+                    out.append(f"\nError:\n{self._preview(stderr)}")
                 return "failed"
 
-        except subprocess.TimeoutExpired:
-            print(f"⏱️  TIMEOUT (>{self.timeout}s)")
+        except asyncio.TimeoutError:
+            out.append(f"⏱️  TIMEOUT (>{self.timeout}s)")
             return "timeout"
         except Exception as e:
-            print(f"⚠️  SKIPPED: {str(e)}")
+            out.append(f"⚠️  SKIPPED: {str(e)}")
             return "skipped"
 
+    @classmethod
+    async def _drain(cls, stream, sink):
+        """Copy a child stream chunk by chunk (raw bytes) into a bounded sink"""
+        while True:
+            chunk = await stream.read(cls.read_chunk_size)
+            if not chunk:
+                break
+            sink.append(chunk)
+
+    @staticmethod
+    def _preview(lines, limit=500):
+        """Decode only the last limit bytes of the captured output"""
+        return b"".join(lines)[-limit:].decode("utf-8", errors="replace")
+
     def run_all(self):
         """Run all sample tests"""
         samples = self.find_samples()
@@ -125,15 +189,30 @@ class SampleTester:
         print(f"# Found {len(samples)} sample files")
         print(f"# Python: {self.python_exe}")
         print(f"# Timeout: {self.timeout}s")
+        print(f"# Jobs: {self.jobs}")
         print(f"{'#' * 70}\n")
 
-        for i, sample in enumerate(samples, 1):
-            print(f"\n[{i}/{len(samples)}]", end=" ")
-            status = self.run_sample(sample)
+        statuses = asyncio.run(self._run_samples(samples))
+        for sample, status in zip(samples, statuses):
             self.results[status].append(sample)
 
         self.print_summary()
 
+    async def _run_samples(self, samples):
+        """Run samples on one event loop, at most self.jobs at a time"""
+        semaphore = asyncio.Semaphore(self.jobs)
+
+        async def run_limited(sample, progress):
+            async with semaphore:
+                return await self._run_sample_async(sample, progress)
+
+        return await asyncio.gather(
+            *(
+                run_limited(sample, f"[{i}/{len(samples)}] ")
+                for i, sample in enumerate(samples, 1)
+            )
+        )
+
     def print_summary(self):
         """Print test summary"""
         total = sum(len(v) for v in self.results.values())
@@ -202,6 +281,14 @@ def main():
         "--pattern", help='Only test samples matching this pattern (e.g., "data-*")'
     )
 
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of samples to run in parallel (default: CPU count)",
+    )
+
     args = parser.parse_args()
 
     tester = SampleTester(
@@ -209,12 +296,15 @@ def main():
         python_exe=args.python,
         timeout=args.timeout,
         verbose=args.verbose,
+        jobs=args.jobs,
     )
 
     # Filter samples if pattern is provided
     if args.pattern:
         all_samples = tester.find_samples()
-        filtered = [s for s in all_samples if args.pattern in str(s)]
+        # Glob semantics ("data-*"); a plain pattern still matches as a substring
+        pattern = re.compile(fnmatch.translate(f"*{args.pattern}*"))
+        filtered = [s for s in all_samples if pattern.match(str(s))]
         print(
             f"Filtered {len(all_samples)} samples to {len(filtered)} matching '{args.pattern}'"
         )
@@ -8,10 +8,18 @@ Batch Test Script for Enterprise Examples
 import subprocess
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# 保留的子进程输出字节数（只解码这部分）
+OUTPUT_LIMIT = 2000
+
 def run_example(example_path, timeout=30):
-    """运行单个示例并返回结果"""
+    """
+    运行单个示例，返回 (是否成功, 输出, 报告文本)
+
+    在线程池中调用时不直接打印，报告由主线程按提交顺序输出，多行内容不会交错
+    """
     try:
         # 构建完整的文件路径
         full_path = Path(example_path).resolve()
@@ -19,31 +27,28 @@ def run_example(example_path, timeout=30):
         # 构建命令
         cmd = [sys.executable, str(full_path)]
         
-        print(f"🏃‍♂️ 正在运行: {example_path}")
-        
         # 运行命令
         result = subprocess.run(
             cmd, 
             capture_output=True, 
-            text=True, 
             timeout=timeout,
             cwd=full_path.parent
         )
         
         if result.returncode == 0:
-            print(f"✅ 成功: {example_path}")
-            return True, result.stdout
+            return True, _decode_tail(result.stdout), f"✅ 成功: {example_path}"
         else:
-            print(f"❌ 失败: {example_path}")
-            print(f"错误输出: {result.stderr}")
-            return False, result.stderr
+            stderr = _decode_tail(result.stderr)
+            return False, stderr, f"❌ 失败: {example_path}\n错误输出: {stderr}"
             
     except subprocess.TimeoutExpired:
-        print(f"⏰ 超时: {example_path}")
-        return False, "Timeout"
+        return False, "Timeout", f"⏰ 超时: {example_path}"
     except Exception as e:
-        print(f"💥 异常: {example_path} - {str(e)}")
-        return False, str(e)
+        return False, str(e), f"💥 异常: {example_path} - {str(e)}"
+
+def _decode_tail(output):
+    """只解码输出末尾的 OUTPUT_LIMIT 个字节"""
+    return output[-OUTPUT_LIMIT:].decode("utf-8", errors="replace")
 
 def test_enterprise_examples():
     """测试所有企业级示例"""
@@ -61,12 +66,19 @@ def test_enterprise_examples():
     results = {}
     
     for example in enterprise_examples:
-        success, output = run_example(example, timeout=60)
-        results[example] = {
-            'success': success,
-            'output': output
-        }
-        print("-" * 30)
+        print(f"🏃‍♂️ 正在运行: {example}")
+    
+    # 各示例在独立子进程中运行，线程只负责等待，可并行执行；
+    # 结果按提交顺序取回并由主线程打印
+    with ThreadPoolExecutor(max_workers=len(enterprise_examples)) as executor:
+        outcomes = executor.map(lambda p: run_example(p, timeout=60), enterprise_examples)
+        for example, (success, output, report) in zip(enterprise_examples, outcomes):
+            print(report)
+            results[example] = {
+                'success': success,
+                'output': output
+            }
+    print("-" * 30)
     
     # 输出汇总
     print("\n📊 测试结果汇总:")
@@ -7,6 +7,8 @@ Backtrader Examples Classification and Organization Plan
 根据功能类型对企业级示例进行分组和分类
 """
 
+import sys
+
 EXAMPLE_CATEGORIES = {
     "企业级核心功能": {
         "描述": "新添加的企业级基础设施功能示例",
@@ -74,23 +76,25 @@ EXAMPLE_CATEGORIES = {
 
 def print_classification_plan():
     """打印分类整理方案"""
-    print("🏛️  Backtrader 示例分类整理方案")
-    print("=" * 60)
+    # 先拼出完整文本，最后一次写出
+    lines = ["🏛️  Backtrader 示例分类整理方案", "=" * 60]
 
     for category, info in EXAMPLE_CATEGORIES.items():
-        print(f"\n📁 {category}")
-        print(f"📝 描述: {info['描述']}")
-        print(f"📄 示例数量: {len(info.get('示例文件', []))}")
+        lines.append(f"\n📁 {category}")
+        lines.append(f"📝 描述: {info['描述']}")
+        lines.append(f"📄 示例数量: {len(info.get('示例文件', []))}")
 
         if "示例文件" in info:
-            print("📋 示例文件:")
-            for i, example in enumerate(info["示例文件"], 1):
-                print(f"  {i}. {example}")
+            lines.append("📋 示例文件:")
+            lines.extend(
+                f"  {i}. {example}" for i, example in enumerate(info["示例文件"], 1)
+            )
 
         if "运行命令" in info:
-            print("⚡ 运行命令:")
-            for cmd in info["运行命令"]:
-                print(f"  $ {cmd}")
+            lines.append("⚡ 运行命令:")
+            lines.extend(f"  $ {cmd}" for cmd in info["运行命令"])
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
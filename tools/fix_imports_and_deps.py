@@ -7,21 +7,65 @@ Universal Module Path Fix Tool
 为所有示例文件添加正确的模块导入路径
 """
 
+import importlib.util
+import json
 import os
+import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import re
 
+# 第一个import语句的匹配模式（模块级预编译，所有文件共用）
+IMPORT_PATTERN = re.compile(r'^(import\s+|from\s+\w+\s+import)', re.MULTILINE)
+
+# 已处理文件的缓存 {路径: [mtime_ns, size]}，文件未变化时重复运行直接跳过
+FIX_CACHE_FILE = '.fix_cache.json'
+
+# 线程池中各文件的输出互斥，避免行内交错
+PRINT_LOCK = threading.Lock()
+
+# add_path_fix_to_file 的处理结果
+FIX_APPLIED = 'fixed'
+FIX_PRESENT = 'present'
+FIX_FAILED = 'failed'
+
+def log(message):
+    """线程安全地输出一行"""
+    with PRINT_LOCK:
+        print(message)
+
+def file_signature(file_path):
+    """文件的 (mtime_ns, size) 签名"""
+    st = os.stat(file_path)
+    return [st.st_mtime_ns, st.st_size]
+
+def load_fix_cache():
+    """读取已处理文件缓存"""
+    try:
+        with open(FIX_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_fix_cache(cache):
+    """写入已处理文件缓存"""
+    with open(FIX_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+
 def add_path_fix_to_file(file_path):
-    """为Python文件添加路径修复代码"""
+    """为Python文件添加路径修复代码，返回 FIX_APPLIED/FIX_PRESENT/FIX_FAILED"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        raw = Path(file_path).read_bytes()
         
-        # 检查是否已经有路径修复代码
-        if 'sys.path.insert(0' in content and 'backtrader' in content:
-            print(f"  ⚠️  {file_path} 已有路径修复代码")
-            return False
+        # 检查是否已经有路径修复代码（直接在字节上查找，需要修改时才解码）
+        if b'sys.path.insert(0' in raw and b'backtrader' in raw:
+            log(f"  ⚠️  {file_path} 已有路径修复代码")
+            return FIX_PRESENT
+        
+        # 与文本模式读取一致：统一换行符
+        content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
         
         # 在导入语句之前添加路径修复代码
         path_fix_code = '''import sys
@@ -31,8 +75,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 '''
         
         # 找到第一个import语句的位置
-        import_pattern = r'^(import\s+|from\s+\w+\s+import)'
-        match = re.search(import_pattern, content, re.MULTILINE)
+        match = IMPORT_PATTERN.search(content)
         
         if match:
             insert_pos = match.start()
@@ -45,12 +88,12 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(new_content)
         
-        print(f"  ✅ 已修复: {file_path}")
-        return True
+        log(f"  ✅ 已修复: {file_path}")
+        return FIX_APPLIED
         
     except Exception as e:
-        print(f"  ❌ 修复失败 {file_path}: {e}")
-        return False
+        log(f"  ❌ 修复失败 {file_path}: {e}")
+        return FIX_FAILED
 
 def fix_all_examples():
     """修复所有示例文件的导入路径"""
@@ -66,27 +109,48 @@ def fix_all_examples():
     ]
     
     fixed_count = 0
+    present_count = 0
     error_count = 0
+    skipped_count = 0
+    cache = load_fix_cache()
     
-    for dir_path in example_dirs:
-        if not os.path.exists(dir_path):
-            continue
+    # 文件读写以I/O等待为主，用线程池重叠处理
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for dir_path in example_dirs:
+            if not os.path.exists(dir_path):
+                continue
+                
+            print(f"\n📁 处理目录: {dir_path}")
             
-        print(f"\n📁 处理目录: {dir_path}")
-        
-        # 遍历目录中的所有.py文件
-        for root, dirs, files in os.walk(dir_path):
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    if add_path_fix_to_file(file_path):
-                        fixed_count += 1
-                    else:
-                        error_count += 1
+            # 先收集目录中的所有.py文件
+            file_paths = [
+                os.path.join(root, file)
+                for root, dirs, files in os.walk(dir_path)
+                for file in files
+                if file.endswith('.py')
+            ]
+            
+            # 上次处理后未变化的文件无需重新读取
+            pending = [p for p in file_paths if cache.get(p) != file_signature(p)]
+            skipped_count += len(file_paths) - len(pending)
+            
+            results = list(executor.map(add_path_fix_to_file, pending))
+            fixed_count += results.count(FIX_APPLIED)
+            present_count += results.count(FIX_PRESENT)
+            error_count += results.count(FIX_FAILED)
+            
+            # 失败的文件不记入缓存，下次运行时重试
+            for file_path, result in zip(pending, results):
+                if result != FIX_FAILED:
+                    cache[file_path] = file_signature(file_path)
+    
+    save_fix_cache(cache)
     
     print(f"\n📊 修复完成:")
     print(f"  ✅ 成功修复: {fixed_count} 个文件")
+    print(f"  ⚠️  已有修复: {present_count} 个文件")
     print(f"  ❌ 处理失败: {error_count} 个文件")
+    print(f"  ⏭️  未变化跳过: {skipped_count} 个文件")
 
 def create_requirements_file():
     """创建requirements.txt文件"""
@@ -141,17 +205,26 @@ def install_missing_dependencies():
         'pyyaml'
     ]
     
-    installed_count = 0
+    # 包名与导入名不一致的情况
+    import_names = {'pyyaml': 'yaml'}
+    
+    missing = []
     for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
+        module = import_names.get(package, package.replace('-', '_'))
+        # find_spec 只查找模块，不执行包的初始化代码
+        if importlib.util.find_spec(module) is not None:
             print(f"  ✅ {package} 已安装")
-        except ImportError:
-            print(f"  ⏬ 安装 {package}...")
-            os.system(f"pip install {package}")
-            installed_count += 1
+        else:
+            missing.append(package)
+    
+    if missing:
+        # 一次 pip 调用安装全部缺失的包，依赖关系只解析一次
+        print(f"  ⏬ 安装 {' '.join(missing)}...")
+        result = subprocess.run([sys.executable, '-m', 'pip', 'install', *missing])
+        if result.returncode != 0:
+            print(f"  ❌ 安装失败 (exit code: {result.returncode})")
     
-    print(f"\n📊 依赖安装完成: 新安装 {installed_count} 个包")
+    print(f"\n📊 依赖安装完成: 新安装 {len(missing)} 个包")
 
 if __name__ == "__main__":
     # 修复导入路径
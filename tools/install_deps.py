@@ -15,102 +15,219 @@
 ###############################################################################
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-import platform
-import subprocess
+import functools
+import importlib.metadata
+import re
 import sys
+from dataclasses import dataclass
+
 
 # ---------------------------------------------------------------------------
 # Dependency definitions
 # ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Pkg:
+    """An installable dependency.
+
+    ``pip_name`` is also the distribution name used by the installed check,
+    so it must match the name pip records (e.g. "TA-Lib" for the "talib"
+    module). ``needs_c_lib`` marks packages that build against a system C
+    library and are installed on their own.
+    """
+
+    import_name: str
+    pip_name: str
+    desc: str
+    needs_c_lib: bool = False
+
+
 GROUPS = {
     "core": {
         "desc": "Core libraries (plotting, numerical, data processing)",
         "packages": [
-            ("numpy", "numpy", "Numerical computation"),
-            ("pandas", "pandas", "Data analysis & DataFrames"),
-            ("matplotlib", "matplotlib", "Charting & visualization"),
+            Pkg("numpy", "numpy", "Numerical computation"),
+            Pkg("pandas", "pandas", "Data analysis & DataFrames"),
+            Pkg("matplotlib", "matplotlib", "Charting & visualization"),
         ],
     },
     "china": {
         "desc": "China market data (A-shares, index, fund, futures via AkShare)",
         "packages": [
-            ("akshare", "akshare", "AkShare - Chinese market data"),
+            Pkg("akshare", "akshare", "AkShare - Chinese market data"),
         ],
     },
     "yahoo": {
         "desc": "Yahoo Finance data (US & global equities)",
         "packages": [
-            ("yfinance", "yfinance", "Yahoo Finance downloader"),
+            Pkg("yfinance", "yfinance", "Yahoo Finance downloader"),
         ],
     },
     "crypto": {
         "desc": "Cryptocurrency exchange integration",
         "packages": [
-            ("ccxt", "ccxt", "Unified crypto exchange API"),
+            Pkg("ccxt", "ccxt", "Unified crypto exchange API"),
+            Pkg("orjson", "orjson", "Fast JSON parser (used by ccxt when installed)"),
         ],
     },
     "talib": {
         "desc": "Technical analysis indicators (requires TA-Lib C library)",
         "packages": [
-            ("talib", "TA-Lib", "Technical Analysis Library"),
+            Pkg("talib", "TA-Lib", "Technical Analysis Library", needs_c_lib=True),
         ],
     },
     "trading": {
         "desc": "Live trading & broker connectors",
         "packages": [
-            ("oandapy", "oandapy", "OANDA forex broker API"),
-            ("requests", "requests", "HTTP client (used by oandapy)"),
+            Pkg("oandapy", "oandapy", "OANDA forex broker API"),
+            Pkg("requests", "requests", "HTTP client (used by oandapy)"),
         ],
     },
     "extras": {
         "desc": "Extra utilities",
         "packages": [
-            (
+            Pkg(
                 "pandas_market_calendars",
                 "pandas_market_calendars",
                 "Exchange trading calendars",
             ),
-            ("influxdb", "influxdb", "InfluxDB time-series database client"),
+            Pkg("influxdb", "influxdb", "InfluxDB time-series database client"),
         ],
     },
 }
 
+# Group names in menu order
+GROUP_KEYS = tuple(GROUPS)
+
 # Preset combinations
 PRESETS = {
-    "core": ["core"],
-    "china": ["core", "china"],
-    "yahoo": ["core", "yahoo"],
-    "crypto": ["core", "crypto"],
-    "all": list(GROUPS.keys()),
+    "core": ("core",),
+    "china": ("core", "china"),
+    "yahoo": ("core", "yahoo"),
+    "crypto": ("core", "crypto"),
+    "all": GROUP_KEYS,
+}
+
+# Interactive menu letters -> preset names
+PRESET_CHOICES = {
+    "a": "all",
+    "c": "core",
+    "cn": "china",
+    "y": "yahoo",
+    "cr": "crypto",
 }
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
-def check_installed(import_name):
-    """Return True if a package is importable."""
-    try:
-        __import__(import_name)
-        return True
-    except ImportError:
-        return False
-
-
-def pip_install(pip_name):
-    """Install a package via pip. Returns True on success."""
-    cmd = [sys.executable, "-m", "pip", "install", pip_name]
-    print(f"  -> pip install {pip_name} ...", end=" ", flush=True)
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode == 0:
-        print("OK")
-        return True
-    else:
+@functools.lru_cache(maxsize=None)
+def _installed_dists():
+    """Return the normalized names of all installed distributions.
+
+    The environment is scanned once and cached; call ``cache_clear()`` after
+    installing packages.
+    """
+    return {
+        _normalize(dist.metadata["Name"])
+        for dist in importlib.metadata.distributions()
+        if dist.metadata["Name"]
+    }
+
+
+def check_installed(pip_name):
+    """Return True if a distribution is installed.
+
+    Only package metadata is read; the package itself is not imported.
+    """
+    return _normalize(pip_name) in _installed_dists()
+
+
+def pip_install(pip_names):
+    """Install packages with a single pip invocation.
+
+    Returns ``(ok, errors)`` where ``errors`` holds pip's ``ERROR:`` lines
+    (or the last stderr line) on failure. stdout is discarded and only the
+    last lines of stderr are kept, so large installs do not buffer pip's
+    whole log in memory.
+    """
+    import os
+    import subprocess
+    from collections import deque
+
+    # Persistent wheel/HTTP cache so repeated runs (e.g. CI) reuse downloads;
+    # mount this directory as a volume or point PIP_CACHE_DIR elsewhere
+    cache_dir = os.environ.get("PIP_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "pip-backtrader"
+    )
+    env = {**os.environ, "PIP_PROGRESS_BAR": "off"}
+    cmd = [
+        sys.executable,
+        "-W",
+        "ignore",
+        "-m",
+        "pip",
+        "install",
+        "--no-input",  # never block waiting for a prompt
+        "--disable-pip-version-check",  # skip the PyPI self-version lookup
+        "--prefer-binary",  # take wheels over newer sdists that need a build
+        "-q",
+        "--cache-dir",
+        cache_dir,
+        *pip_names,
+    ]
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+        env=env,
+    )
+    with proc.stderr:
+        tail = deque((line.rstrip() for line in proc.stderr), maxlen=32)
+    if proc.wait() == 0:
+        return True, []
+    output = [line for line in tail if line]
+    errors = [line for line in output if line.startswith("ERROR:")]
+    return False, errors or output[-1:] or ["unknown error"]
+
+
+def _mentions(line, pip_name):
+    """Return True if a pip message line names the given package."""
+    name = re.escape(_normalize(pip_name))
+    return re.search(rf"(?<![\w-]){name}(?![\w-])", _normalize(line)) is not None
+
+
+def _normalize(text):
+    """Lower-case and fold runs of -, _ and . the way pip compares names."""
+    return re.sub(r"[-_.]+", "-", text.lower())
+
+
+def install_batch(pip_names):
+    """Install packages together, splitting out the ones pip rejects.
+
+    pip resolves a batch atomically, so one bad requirement fails all of
+    them. Packages named in the ``ERROR:`` lines are marked failed and the
+    rest are retried as a new batch. Returns ``(success, failed)``, where
+    ``failed`` maps package names to an error message.
+    """
+    remaining, failed = list(pip_names), {}
+    while remaining:
+        print(f"  -> pip install {' '.join(remaining)} ...", end=" ", flush=True)
+        ok, errors = pip_install(remaining)
+        if ok:
+            print("OK")
+            return remaining, failed
         print("FAILED")
-        print(
-            f"     {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'unknown error'}"
-        )
-        return False
+        culprits = [
+            p for p in remaining if any(_mentions(line, p) for line in errors)
+        ] or remaining
+        for pip_name in culprits:
+            message = next((l for l in errors if _mentions(l, pip_name)), errors[-1])
+            failed[pip_name] = message
+            print(f"     {pip_name}: {message}")
+        remaining = [p for p in remaining if p not in culprits]
+    return [], failed
 
 
 def show_status():
@@ -118,31 +235,56 @@ def show_status():
     print("\n=== Backtrader dependency status ===\n")
     for group_name, group in GROUPS.items():
         print(f"[{group_name}] {group['desc']}")
-        for import_name, pip_name, desc in group["packages"]:
-            status = "installed" if check_installed(import_name) else "NOT installed"
-            print(f"  {pip_name:<28s} {status:<16s} - {desc}")
+        for pkg in group["packages"]:
+            status = "installed" if check_installed(pkg.pip_name) else "NOT installed"
+            print(f"  {pkg.pip_name:<28s} {status:<16s} - {pkg.desc}")
         print()
 
 
 def install_groups(group_names):
-    """Install all packages in the given groups."""
+    """Install all packages in the given groups.
+
+    Missing packages go into one ``pip install`` call, which pays
+    pip's startup and index setup once. Packages that need a system C
+    library (TA-Lib) are installed separately afterwards so that a missing
+    library does not fail the batch.
+    """
     success, failed = [], []
+    pending = []
     for gname in group_names:
         group = GROUPS[gname]
         print(f"\n--- [{gname}] {group['desc']} ---")
-        for import_name, pip_name, desc in group["packages"]:
-            if check_installed(import_name):
-                print(f"  {pip_name} already installed, skipping.")
-                success.append(pip_name)
+        for pkg in group["packages"]:
+            if pkg in pending:
+                continue
+            if check_installed(pkg.pip_name):
+                print(f"  {pkg.pip_name} already installed, skipping.")
+                success.append(pkg.pip_name)
             else:
-                if pip_name == "TA-Lib":
-                    print(
-                        f"  {pip_name} requires the TA-Lib C library to be installed first."
-                    )
-                    _print_talib_hint()
-                    # Still try pip install; it will fail gracefully if C lib missing
-                ok = pip_install(pip_name)
-                (success if ok else failed).append(pip_name)
+                print(f"  {pkg.pip_name} queued for install.")
+                pending.append(pkg)
+
+    to_install = [pkg.pip_name for pkg in pending if not pkg.needs_c_lib]
+    if to_install:
+        print()
+        installed, rejected = install_batch(to_install)
+        success.extend(installed)
+        failed.extend(rejected)
+
+    for pkg in pending:
+        if not pkg.needs_c_lib:
+            continue
+        print(
+            f"\n  {pkg.pip_name} requires the {pkg.pip_name} C library to be installed first."
+        )
+        _print_talib_hint()
+        # Still try pip install; it will fail gracefully if C lib missing
+        installed, rejected = install_batch([pkg.pip_name])
+        success.extend(installed)
+        failed.extend(rejected)
+
+    # Packages were installed; later status checks must rescan
+    _installed_dists.cache_clear()
 
     print("\n=== Summary ===")
     print(f"  Succeeded: {len(success)}  ({', '.join(success) if success else '-'})")
@@ -153,6 +295,8 @@ def install_groups(group_names):
 
 def _print_talib_hint():
     """Print platform-specific TA-Lib C library installation hints."""
+    import platform
+
     os_name = platform.system()
     if os_name == "Darwin":
         print("  Hint (macOS): brew install ta-lib")
@@ -174,7 +318,7 @@ def interactive_menu():
     print("Available dependency groups:")
     print()
     for i, (gname, group) in enumerate(GROUPS.items(), 1):
-        pkgs = ", ".join(p[1] for p in group["packages"])
+        pkgs = ", ".join(p.pip_name for p in group["packages"])
         print(f"  {i}. [{gname}] {group['desc']}")
         print(f"     Packages: {pkgs}")
     print()
@@ -196,26 +340,17 @@ def interactive_menu():
         print("Bye.")
         sys.exit(0)
 
-    preset_map = {
-        "a": "all",
-        "c": "core",
-        "cn": "china",
-        "y": "yahoo",
-        "cr": "crypto",
-    }
-
-    if choice in preset_map:
-        return PRESETS[preset_map[choice]]
+    if choice in PRESET_CHOICES:
+        return PRESETS[PRESET_CHOICES[choice]]
 
     # Parse numeric selection
-    group_keys = list(GROUPS.keys())
     selected = []
     for part in choice.split(","):
         part = part.strip()
         if part.isdigit():
             idx = int(part) - 1
-            if 0 <= idx < len(group_keys):
-                selected.append(group_keys[idx])
+            if 0 <= idx < len(GROUP_KEYS):
+                selected.append(GROUP_KEYS[idx])
             else:
                 print(f"Invalid number: {part}")
         elif part in GROUPS:
@@ -233,7 +368,15 @@ def interactive_menu():
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
-def main():
+# Flags that select a single action; a lone one of these skips argparse
+FLAGS = ("--list", "--all", "--core", "--china", "--yahoo", "--crypto")
+
+
+def parse_args(argv):
+    """Parse the command line with argparse.
+
+    Returns ``"list"``, a preset name, or None when no flag was given.
+    """
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -261,22 +404,36 @@ def main():
     parser.add_argument(
         "--list", action="store_true", help="List all dependencies and their status"
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.list:
+        return "list"
+    for preset_name in ("all", "core", "china", "yahoo", "crypto"):
+        if getattr(args, preset_name, False):
+            return preset_name
+    return None
+
+
+def main():
+    argv = sys.argv[1:]
+    if not argv:
+        action = None
+    elif len(argv) == 1 and argv[0] in FLAGS:
+        # Common case: a single known flag, dispatched without argparse
+        action = argv[0][2:]
+    else:
+        action = parse_args(argv)
+
+    if action == "list":
         show_status()
         sys.exit(0)
 
     # Determine which groups to install
-    groups_to_install = None
-    for preset_name in ("all", "core", "china", "yahoo", "crypto"):
-        if getattr(args, preset_name, False):
-            groups_to_install = PRESETS[preset_name]
-            break
-
-    if groups_to_install is None:
+    if action is None:
         # No flag given -> interactive mode
         groups_to_install = interactive_menu()
+    else:
+        groups_to_install = PRESETS[action]
 
     ok = install_groups(groups_to_install)
     print()
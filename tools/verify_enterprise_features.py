@@ -7,10 +7,43 @@ Enterprise Features Integrity Verification Script
 
 import sys
 import os
+import ast
+import functools
+import itertools
+import importlib.util
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+def _resolve(root, path):
+    """按点分路径逐级取属性（不经过 eval）"""
+    return functools.reduce(getattr, path.split('.'), root)
+
+@functools.lru_cache(maxsize=None)
+def _parse_example(path, mtime):
+    """解析示例文件前50行的语法树（按路径和修改时间缓存）"""
+    # 只读取前50行，文件其余部分不读入也不解码
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = list(itertools.islice(f, 50))
+    while True:
+        try:
+            return ast.parse(''.join(lines), filename=path)
+        except SyntaxError as e:
+            # 截断处可能落在语句中间，丢弃不完整的尾部后重试
+            if not e.lineno or e.lineno <= 1:
+                raise
+            lines = lines[:e.lineno - 1]
+
+def _imported_modules(tree):
+    """返回语法树中绝对导入的顶层模块名"""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split('.')[0])
+    return sorted(names)
+
 def test_module_imports():
     """测试所有企业级模块导入"""
     print("🧪 模块导入测试")
@@ -26,11 +59,13 @@ def test_module_imports():
         ('messaging', '消息队列')
     ]
     
+    import backtrader as bt
+    
     results = {}
     
     for module_name, description in modules_to_test:
         try:
-            module = getattr(__import__('backtrader'), module_name)
+            module = getattr(bt, module_name)
             print(f"✅ {description} ({module_name}): 导入成功")
             results[module_name] = True
         except Exception as e:
@@ -72,7 +107,7 @@ def test_core_functions():
         try:
             # 动态获取函数
             module_path, func_name = func_path.rsplit('.', 1)
-            module = eval(f'bt.{module_path}')
+            module = _resolve(bt, module_path)
             func = getattr(module, func_name)
             print(f"✅ {description}: 可用")
             results[func_path] = True
@@ -102,27 +137,17 @@ def test_example_execution():
             
         try:
             print(f"🧪 测试 {description}...")
-            # 执行示例的前几行来验证基本功能
-            with open(example_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 提取前50行进行测试
-            test_content = '\n'.join(content.split('\n')[:50])
-            
-            # 创建临时测试环境
-            exec_globals = {
-                '__name__': '__main__',
-                '__file__': example_path,
-                'sys': sys,
-                'os': os,
-            }
-            
-            exec(test_content, exec_globals)
-            print(f"✅ {description}: 基本执行成功")
+            # 只做静态检查：解析示例前50行并确认其导入均可解析，不执行示例代码
+            tree = _parse_example(example_path, os.path.getmtime(example_path))
+            missing = [name for name in _imported_modules(tree)
+                       if importlib.util.find_spec(name) is None]
+            if missing:
+                raise ImportError(f"无法解析的导入: {', '.join(missing)}")
+            print(f"✅ {description}: 基本检查通过")
             results[example_path] = True
             
         except Exception as e:
-            print(f"❌ {description}: 执行失败 - {str(e)[:100]}...")
+            print(f"❌ {description}: 检查失败 - {str(e)[:100]}...")
             results[example_path] = False
     
     return results